@@ -7,6 +7,7 @@ from django.contrib.auth.models import User
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Row, Column, Field
 from .models import StudentProfile, Department
+from main import reference
 
 class StudentRegistrationForm(UserCreationForm):
     """Registration form for students"""
@@ -24,6 +25,8 @@ class StudentRegistrationForm(UserCreationForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # Render the options from cached rows instead of querying per form
+        self.fields['department'].choices = reference.department_choices()
         self.helper = FormHelper()
         self.helper.layout = Layout(
             Row(
@@ -106,6 +109,7 @@ class StudentProfileForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.fields['department'].choices = reference.department_choices()
         self.helper = FormHelper()
         self.helper.layout = Layout(
             Row(
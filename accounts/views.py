@@ -10,8 +10,10 @@ from django.views.generic import TemplateView, ListView, DetailView
 from django.contrib import messages
 from django.core.paginator import Paginator
 
-from .models import StudentProfile, Faculty, Department
+from .models import StudentProfile, Faculty
 from .forms import StudentRegistrationForm, StudentProfileForm, UserUpdateForm
+from main import reference
+from main.pagination import CursorPaginationMixin
 
 class CustomLoginView(LoginView):
     """Custom login view with enhanced styling"""
@@ -103,12 +105,13 @@ class EditProfileView(LoginRequiredMixin, TemplateView):
                 'profile_form': profile_form
             })
 
-class FacultyListView(ListView):
+class FacultyListView(CursorPaginationMixin, ListView):
     """List view for all faculty members"""
     model = Faculty
     template_name = 'accounts/faculty_list.html'
     context_object_name = 'faculty_members'
     paginate_by = 12
+    cursor_ordering = ('user__last_name', 'user__first_name', 'pk')
     
     def get_queryset(self):
         queryset = Faculty.objects.select_related('user', 'department')
@@ -127,7 +130,7 @@ class FacultyListView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['departments'] = Department.objects.all()
+        context['departments'] = reference.departments.get()
         context['designations'] = Faculty.DESIGNATION_CHOICES
         context['selected_department'] = self.request.GET.get('department', '')
         context['selected_designation'] = self.request.GET.get('designation', '')
@@ -139,9 +142,12 @@ class FacultyDetailView(DetailView):
     template_name = 'accounts/faculty_detail.html'
     context_object_name = 'faculty'
     
+    def get_queryset(self):
+        return Faculty.objects.select_related('user', 'department')
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Get courses taught by this faculty member
         from courses.models import Course
-        context['courses'] = Course.objects.filter(instructor=self.object)
+        context['courses'] = Course.objects.filter(instructor=self.object).select_related('department', 'instructor__user')
         return context
\ No newline at end of file
@@ -1,13 +1,33 @@
 """
 Admin configuration for courses app
 """
+from django import forms
 from django.contrib import admin
-from .models import Course, Enrollment, Assignment, Material
+from .models import Course, Enrollment, EnrollmentRequest, Assignment, Material
+from .prerequisites import creates_cycle
+from .services import recount_seats
+
+class CourseAdminForm(forms.ModelForm):
+    """Course admin form that rejects circular prerequisites"""
+    
+    class Meta:
+        model = Course
+        fields = '__all__'
+    
+    def clean_prerequisites(self):
+        prerequisites = self.cleaned_data['prerequisites']
+        if creates_cycle(self.instance, prerequisites):
+            raise forms.ValidationError(
+                "These prerequisites would create a cycle: a course cannot "
+                "require itself or a course that depends on it."
+            )
+        return prerequisites
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
     """Admin interface for courses"""
-    list_display = ['code', 'name', 'department', 'instructor', 'credits', 'semester', 'year', 'is_active', 'is_featured']
+    form = CourseAdminForm
+    list_display = ['code', 'name', 'department', 'instructor', 'credits', 'semester', 'year', 'seats_taken', 'max_students', 'is_active', 'is_featured']
     list_filter = ['department', 'level', 'semester', 'year', 'is_active', 'is_featured']
     search_fields = ['name', 'code', 'instructor__user__first_name', 'instructor__user__last_name']
     ordering = ['department', 'code']
@@ -31,6 +51,12 @@ class CourseAdmin(admin.ModelAdmin):
     )
     
     filter_horizontal = ['prerequisites']
+    actions = ['recount_enrolled_seats']
+    
+    def recount_enrolled_seats(self, request, queryset):
+        updated = recount_seats(queryset)
+        self.message_user(request, f"Recounted enrolled seats for {updated} course(s).")
+    recount_enrolled_seats.short_description = "Recount enrolled seats from enrollments"
 
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
@@ -41,6 +67,15 @@ class EnrollmentAdmin(admin.ModelAdmin):
     readonly_fields = ['enrollment_date']
     ordering = ['-enrollment_date']
 
+@admin.register(EnrollmentRequest)
+class EnrollmentRequestAdmin(admin.ModelAdmin):
+    """Admin interface for queued enrollment requests"""
+    list_display = ['student', 'course', 'status', 'message', 'created_at', 'processed_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['student__student_id', 'course__code']
+    readonly_fields = ['created_at', 'processed_at']
+    ordering = ['-created_at']
+
 @admin.register(Assignment)
 class AssignmentAdmin(admin.ModelAdmin):
     """Admin interface for assignments"""
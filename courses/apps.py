@@ -0,0 +1,12 @@
+"""
+App configuration for courses app
+"""
+from django.apps import AppConfig
+
+
+class CoursesConfig(AppConfig):
+    """Courses app configuration; wires up model signal handlers"""
+    name = 'courses'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,36 @@
+"""
+Apply queued enrollment requests in batches
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses.services import process_enrollment_queue
+
+
+class Command(BaseCommand):
+    help = 'Apply pending enrollment requests (used when ENROLLMENT_QUEUE_ENABLED is on)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Maximum requests applied per transaction')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep draining the queue until interrupted')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty (with --loop)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        try:
+            while True:
+                accepted, rejected = process_enrollment_queue(batch_size)
+                if accepted or rejected:
+                    self.stdout.write(f'Accepted {accepted}, rejected {rejected} request(s).')
+                if not options['loop']:
+                    break
+                # Go straight on to the next batch while there is a backlog
+                if accepted + rejected < batch_size:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS('Enrollment queue processed.'))
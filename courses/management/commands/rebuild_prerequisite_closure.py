@@ -0,0 +1,14 @@
+"""
+Rebuild the precomputed prerequisite closure for every course
+"""
+from django.core.management.base import BaseCommand
+
+from courses.prerequisites import rebuild_closure
+
+
+class Command(BaseCommand):
+    help = 'Recompute the transitive closure of course prerequisites'
+
+    def handle(self, *args, **options):
+        courses = rebuild_closure()
+        self.stdout.write(self.style.SUCCESS(f'Prerequisite closure rebuilt for {len(courses)} course(s).'))
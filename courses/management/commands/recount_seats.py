@@ -0,0 +1,14 @@
+"""
+Recompute each course's seat counter from its active enrollments
+"""
+from django.core.management.base import BaseCommand
+
+from courses.services import recount_seats
+
+
+class Command(BaseCommand):
+    help = 'Recompute Course.seats_taken from active enrollments'
+
+    def handle(self, *args, **options):
+        updated = recount_seats()
+        self.stdout.write(self.style.SUCCESS(f'Recounted seats for {updated} course(s).'))
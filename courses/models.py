@@ -31,6 +31,11 @@ class Course(models.Model):
     level = models.CharField(max_length=15, choices=LEVEL_CHOICES)
     prerequisites = models.ManyToManyField('self', blank=True, symmetrical=False)
     max_students = models.IntegerField(default=50)
+    seats_taken = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Active enrollments; maintained by courses.services"
+    )
     schedule = models.CharField(max_length=200, help_text="e.g., Mon/Wed/Fri 10:00-11:00")
     classroom = models.CharField(max_length=50, blank=True)
     syllabus = models.FileField(upload_to='courses/syllabi/', blank=True)
@@ -42,6 +47,20 @@ class Course(models.Model):
     class Meta:
         ordering = ['department', 'code']
         unique_together = ['code', 'semester', 'year']
+        # Conditional on is_active so SQLite can use them for the views'
+        # active-only queries (see events.models.Event)
+        indexes = [
+            models.Index(
+                fields=['department', 'code'],
+                condition=models.Q(is_active=True),
+                name='course_active_department_idx',
+            ),
+            models.Index(
+                fields=['level', 'semester'],
+                condition=models.Q(is_active=True),
+                name='course_active_level_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.code} - {self.name}"
@@ -51,15 +70,29 @@ class Course(models.Model):
     
     @property
     def enrolled_count(self):
-        return self.enrollments.filter(is_active=True).count()
+        return self.seats_taken
     
     @property
     def available_spots(self):
-        return self.max_students - self.enrolled_count
+        return max(self.max_students - self.seats_taken, 0)
     
     @property
     def is_full(self):
-        return self.enrolled_count >= self.max_students
+        return self.seats_taken >= self.max_students
+
+class CoursePrerequisiteClosure(models.Model):
+    """Transitive closure of Course.prerequisites, maintained by courses.prerequisites"""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='prerequisite_closure')
+    prerequisite = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='dependent_closure')
+    
+    class Meta:
+        unique_together = ['course', 'prerequisite']
+        indexes = [
+            models.Index(fields=['prerequisite', 'course']),
+        ]
+    
+    def __str__(self):
+        return f"{self.course_id} requires {self.prerequisite_id}"
 
 class Enrollment(models.Model):
     """Model for student course enrollments"""
@@ -80,10 +113,53 @@ class Enrollment(models.Model):
     class Meta:
         unique_together = ['student', 'course']
         ordering = ['-enrollment_date']
+        indexes = [
+            models.Index(
+                fields=['student', 'enrollment_date'],
+                condition=models.Q(is_active=True),
+                name='enrollment_active_student_idx',
+            ),
+            models.Index(
+                fields=['course'],
+                condition=models.Q(is_active=True),
+                name='enrollment_active_course_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.course.code}"
 
+class EnrollmentRequest(models.Model):
+    """Queued enrollment intent, applied in batches by process_enrollment_queue"""
+    STATUS_PENDING = 'pending'
+    STATUS_ACCEPTED = 'accepted'
+    STATUS_REJECTED = 'rejected'
+    
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_ACCEPTED, 'Accepted'),
+        (STATUS_REJECTED, 'Rejected'),
+    ]
+    
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollment_requests')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    message = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.student_id} -> {self.course.code} ({self.status})"
+    
+    def get_absolute_url(self):
+        return reverse('courses:enrollment_request_status', kwargs={'pk': self.pk})
+
 class Assignment(models.Model):
     """Model for course assignments"""
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='assignments')
@@ -97,6 +173,13 @@ class Assignment(models.Model):
     
     class Meta:
         ordering = ['due_date']
+        indexes = [
+            models.Index(
+                fields=['course', 'due_date'],
+                condition=models.Q(is_published=True),
+                name='assignment_published_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.course.code} - {self.title}"
@@ -121,6 +204,13 @@ class Material(models.Model):
     
     class Meta:
         ordering = ['-upload_date']
+        indexes = [
+            models.Index(
+                fields=['course', 'upload_date'],
+                condition=models.Q(is_published=True),
+                name='material_published_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.course.code} - {self.title}"
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+Prerequisite graph for courses
+
+The direct edges live in ``Course.prerequisites``; every (course, required
+course) pair reachable through them is precomputed in
+``CoursePrerequisiteClosure``. Cycle checks and eligibility checks are then
+single indexed lookups instead of recursive queries.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import Course, CoursePrerequisiteClosure, Enrollment
+
+
+def _load_graph():
+    edges = defaultdict(set)
+    through = Course.prerequisites.through
+    for from_id, to_id in through.objects.values_list('from_course_id', 'to_course_id'):
+        edges[from_id].add(to_id)
+    return edges
+
+
+def _reachable(edges, start):
+    seen, stack = set(), list(edges.get(start, ()))
+    while stack:
+        course_id = stack.pop()
+        # A cycle in legacy data must not loop forever or list the course
+        # as its own prerequisite
+        if course_id in seen or course_id == start:
+            continue
+        seen.add(course_id)
+        stack.extend(edges.get(course_id, ()))
+    return seen
+
+
+def dependents_of(course_ids):
+    """Ids of every course that requires any of ``course_ids``, directly or not"""
+    return set(
+        CoursePrerequisiteClosure.objects.filter(prerequisite_id__in=course_ids)
+        .values_list('course_id', flat=True)
+    )
+
+
+def rebuild_closure(course_ids=None):
+    """
+    Recompute closure rows for the given courses and everything depending
+    on them, or for every course when ``course_ids`` is None
+    """
+    edges = _load_graph()
+    with transaction.atomic():
+        if course_ids is None:
+            affected = set(Course.objects.values_list('pk', flat=True))
+            CoursePrerequisiteClosure.objects.all().delete()
+        else:
+            affected = set(course_ids) | dependents_of(course_ids)
+            CoursePrerequisiteClosure.objects.filter(course_id__in=affected).delete()
+        
+        CoursePrerequisiteClosure.objects.bulk_create([
+            CoursePrerequisiteClosure(course_id=course_id, prerequisite_id=required_id)
+            for course_id in affected
+            for required_id in _reachable(edges, course_id)
+        ], batch_size=1000)
+    return affected
+
+
+def creates_cycle(course, prerequisites):
+    """True if making ``prerequisites`` required for ``course`` would form a cycle"""
+    prerequisite_ids = {p.pk for p in prerequisites}
+    if course.pk is None or not prerequisite_ids:
+        return False
+    if course.pk in prerequisite_ids:
+        return True
+    # A cycle appears if any new prerequisite already requires this course
+    return CoursePrerequisiteClosure.objects.filter(
+        course_id__in=prerequisite_ids,
+        prerequisite_id=course.pk
+    ).exists()
+
+
+def missing_prerequisites(student, course):
+    """Courses in the prerequisite closure that the student has not completed"""
+    required = set(
+        CoursePrerequisiteClosure.objects.filter(course=course)
+        .values_list('prerequisite_id', flat=True)
+    )
+    if not required:
+        return []
+    completed = set(
+        Enrollment.objects.filter(
+            student=student,
+            course_id__in=required,
+            status='completed'
+        ).values_list('course_id', flat=True)
+    )
+    return list(Course.objects.filter(pk__in=required - completed).order_by('code'))
@@ -0,0 +1,199 @@
+"""
+Enrollment services for courses app
+
+Seats are claimed with a conditional UPDATE on ``Course.seats_taken`` inside
+the same transaction that writes the enrollment row. The UPDATE takes the
+row (or, on SQLite, database) write lock, so concurrent requests for the
+last seat are serialized and the course can never be oversubscribed.
+
+With ``ENROLLMENT_QUEUE_ENABLED`` the enroll view only records an
+``EnrollmentRequest``; ``process_enrollment_queue`` then applies pending
+requests in batches, taking one write transaction per batch instead of one
+per student.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Course, Enrollment, EnrollmentRequest
+from main import statistics
+
+
+class EnrollmentError(Exception):
+    """Raised when an enrollment or drop request cannot be honoured"""
+
+
+def _check_can_enroll(enrollment):
+    """Raise unless an existing enrollment row may be reactivated"""
+    if enrollment is None:
+        return
+    if enrollment.is_active:
+        raise EnrollmentError('You are already enrolled in this course.')
+    if enrollment.status == 'completed':
+        # Reactivating would erase the completion prerequisites rely on
+        raise EnrollmentError('You have already completed this course.')
+
+
+def enroll_student(student, course):
+    """Enroll a student in a course, claiming one seat atomically"""
+    with transaction.atomic():
+        # Checked before claiming so a student already in a full course is
+        # told so rather than that it is full
+        _check_can_enroll(Enrollment.objects.filter(student=student, course=course).first())
+        
+        claimed = Course.objects.filter(
+            pk=course.pk,
+            is_active=True,
+            seats_taken__lt=F('max_students')
+        ).update(seats_taken=F('seats_taken') + 1)
+        if not claimed:
+            raise EnrollmentError('This course is full.')
+        
+        # Checked again now the course lock is held, in case a concurrent
+        # request enrolled the student; raising releases the seat
+        enrollment = Enrollment.objects.filter(student=student, course=course).first()
+        _check_can_enroll(enrollment)
+        if enrollment is None:
+            enrollment = Enrollment.objects.create(student=student, course=course)
+        else:
+            # Re-enrolling after a drop reuses the existing row
+            enrollment.is_active = True
+            enrollment.status = 'enrolled'
+            enrollment.grade = ''
+            enrollment.save(update_fields=['is_active', 'status', 'grade'])
+    
+    course.refresh_from_db(fields=['seats_taken'])
+    return enrollment
+
+
+def unenroll_student(student, course):
+    """Drop a student's active enrollment and release the seat"""
+    with transaction.atomic():
+        dropped = Enrollment.objects.filter(
+            student=student,
+            course=course,
+            is_active=True
+        ).update(is_active=False, status='dropped')
+        if not dropped:
+            raise EnrollmentError('You are not enrolled in this course.')
+        statistics.adjust_enrollments(course.department_id, -dropped)
+        
+        Course.objects.filter(pk=course.pk, seats_taken__gt=0).update(
+            seats_taken=F('seats_taken') - 1
+        )
+    
+    course.refresh_from_db(fields=['seats_taken'])
+
+
+def recount_seats(queryset=None):
+    """Recompute seats_taken from enrollment rows, e.g. after admin edits"""
+    queryset = Course.objects.all() if queryset is None else queryset
+    active = Enrollment.objects.filter(
+        course=OuterRef('pk'), is_active=True
+    ).values('course').annotate(total=Count('pk')).values('total')
+    return queryset.update(seats_taken=Coalesce(Subquery(active), 0))
+
+
+def queue_enrollment(student, course):
+    """Record an enrollment intent; a pending request is reused if one exists"""
+    request = EnrollmentRequest.objects.filter(
+        student=student,
+        course=course,
+        status=EnrollmentRequest.STATUS_PENDING
+    ).first()
+    if request is None:
+        request = EnrollmentRequest.objects.create(student=student, course=course)
+    return request
+
+
+def _decide_course_requests(course, requests, enrollments):
+    """Split one course's requests into accepted and rejected, first come first served"""
+    free = course.max_students - course.seats_taken if course.is_active else 0
+    enrolled = {student_id for student_id, e in enrollments.items() if e.is_active}
+    completed = {student_id for student_id, e in enrollments.items() if e.status == 'completed'}
+    accepted, rejected = [], defaultdict(list)
+    
+    for request in requests:
+        if not course.is_active:
+            rejected['This course is not open for enrollment.'].append(request.pk)
+        elif request.student_id in enrolled:
+            rejected['You are already enrolled in this course.'].append(request.pk)
+        elif request.student_id in completed:
+            rejected['You have already completed this course.'].append(request.pk)
+        elif free <= 0:
+            rejected['This course is full.'].append(request.pk)
+        else:
+            accepted.append(request)
+            enrolled.add(request.student_id)
+            free -= 1
+    return accepted, rejected
+
+
+def process_enrollment_queue(batch_size=500):
+    """
+    Apply up to ``batch_size`` pending enrollment requests in one transaction
+
+    Returns ``(accepted, rejected)`` counts.
+    """
+    total_accepted = total_rejected = 0
+    with transaction.atomic():
+        requests = list(
+            EnrollmentRequest.objects.select_for_update()
+            .filter(status=EnrollmentRequest.STATUS_PENDING)
+            .order_by('created_at', 'pk')[:batch_size]
+        )
+        by_course = defaultdict(list)
+        for request in requests:
+            by_course[request.course_id].append(request)
+        
+        courses = Course.objects.select_for_update().in_bulk(list(by_course))
+        now = timezone.now()
+        
+        for course_id, course_requests in by_course.items():
+            course = courses.get(course_id)
+            if course is None:
+                continue
+            enrollments = {
+                e.student_id: e
+                for e in Enrollment.objects.filter(
+                    course_id=course_id,
+                    student_id__in=[r.student_id for r in course_requests]
+                )
+            }
+            accepted, rejected = _decide_course_requests(course, course_requests, enrollments)
+            
+            # Students who dropped earlier get their old row back
+            reactivate = [enrollments[r.student_id].pk for r in accepted if r.student_id in enrollments]
+            Enrollment.objects.filter(pk__in=reactivate).update(
+                is_active=True, status='enrolled', grade=''
+            )
+            Enrollment.objects.bulk_create([
+                Enrollment(student_id=r.student_id, course_id=course_id)
+                for r in accepted if r.student_id not in enrollments
+            ])
+            if accepted:
+                Course.objects.filter(pk=course_id).update(
+                    seats_taken=F('seats_taken') + len(accepted)
+                )
+                # The update and bulk_create above skip the model signals
+                statistics.adjust_enrollments(course.department_id, len(accepted))
+            
+            EnrollmentRequest.objects.filter(pk__in=[r.pk for r in accepted]).update(
+                status=EnrollmentRequest.STATUS_ACCEPTED,
+                message=f'Successfully enrolled in {course.name}!',
+                processed_at=now
+            )
+            for message, request_ids in rejected.items():
+                EnrollmentRequest.objects.filter(pk__in=request_ids).update(
+                    status=EnrollmentRequest.STATUS_REJECTED,
+                    message=message,
+                    processed_at=now
+                )
+            
+            total_accepted += len(accepted)
+            total_rejected += sum(len(ids) for ids in rejected.values())
+    
+    return total_accepted, total_rejected
@@ -0,0 +1,54 @@
+"""
+Signal handlers for courses app
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import prerequisites
+from .models import Assignment, Course, Material
+
+
+def touch_courses(course_ids):
+    """Bump updated_at so HTTP validators notice changes to related rows"""
+    Course.objects.filter(pk__in=course_ids).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Course.prerequisites.through)
+def update_prerequisite_closure(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        changed = [instance.pk]
+    elif pk_set:
+        changed = list(pk_set)
+    else:
+        # Reverse clear: every course that listed this one is affected
+        changed = list(prerequisites.dependents_of([instance.pk]))
+    touch_courses(changed)
+    transaction.on_commit(lambda: prerequisites.rebuild_closure(changed))
+
+
+@receiver(pre_delete, sender=Course)
+def remember_prerequisite_dependents(sender, instance, **kwargs):
+    # Closure rows are cascaded away with the course, so collect the
+    # courses that required it while they can still be found
+    instance._prerequisite_dependents = prerequisites.dependents_of([instance.pk])
+
+
+@receiver(post_delete, sender=Course)
+def update_dependent_closures(sender, instance, **kwargs):
+    dependents = getattr(instance, '_prerequisite_dependents', None)
+    if dependents:
+        transaction.on_commit(lambda: prerequisites.rebuild_closure(dependents))
+
+
+@receiver(post_save, sender=Material)
+@receiver(post_delete, sender=Material)
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def touch_course_for_content(sender, instance, raw=False, **kwargs):
+    # The course detail page lists published materials and assignments
+    if not raw:
+        touch_courses([instance.course_id])
@@ -11,6 +11,7 @@ urlpatterns = [
     path('<int:pk>/', views.CourseDetailView.as_view(), name='course_detail'),
     path('<int:pk>/enroll/', views.EnrollView.as_view(), name='enroll'),
     path('<int:pk>/unenroll/', views.UnenrollView.as_view(), name='unenroll'),
+    path('enrollment-requests/<int:pk>/', views.EnrollmentRequestStatusView.as_view(), name='enrollment_request_status'),
     path('my-courses/', views.MyCoursesView.as_view(), name='my_courses'),
     path('departments/', views.DepartmentListView.as_view(), name='department_list'),
     path('departments/<int:pk>/', views.DepartmentDetailView.as_view(), name='department_detail'),
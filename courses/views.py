@@ -1,29 +1,50 @@
 """
 Courses app views for course management and enrollment
 """
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.views.generic import ListView, DetailView, TemplateView
-from django.db.models import Q, Count
+from django.views.generic import ListView, DetailView, TemplateView, View
+from django.db.models import Q, Count, F, Max, Sum
+from django.db.models.functions import Coalesce
 from django.core.paginator import Paginator
 
-from .models import Course, Enrollment, Assignment, Material
+from .models import Course, CoursePrerequisiteClosure, Enrollment, EnrollmentRequest, Assignment, Material
+from .prerequisites import missing_prerequisites
+from .services import EnrollmentError, enroll_student, queue_enrollment, unenroll_student
 from accounts.models import Department, StudentProfile
+from main import reference
+from main.models import DepartmentStatistics
+from main.http import ActionResponseMixin, ConditionalGetMixin, filter_signature
+from main.pagination import CursorPaginationMixin
 
-class CourseListView(ListView):
+class CourseListView(ConditionalGetMixin, CursorPaginationMixin, ListView):
     """List view for all courses"""
     model = Course
     template_name = 'courses/course_list.html'
     context_object_name = 'courses'
     paginate_by = 12
+    # Meta.ordering sorts by department, i.e. by the department's name
+    cursor_ordering = ('department__name', 'code', 'pk')
+    
+    def get_validators(self):
+        # Course edits bump updated_at, deletions change the count and
+        # enrollments change the seat total
+        stats = Course.objects.aggregate(
+            latest=Max('updated_at'), total=Count('pk'), seats=Sum('seats_taken')
+        )
+        parts = [
+            stats['latest'], stats['total'], stats['seats'], reference.departments.version(),
+            *filter_signature(self.request, 'department', 'level', 'semester', 'search', 'page', 'cursor'),
+        ]
+        return parts, None
     
     def get_queryset(self):
         queryset = Course.objects.filter(is_active=True).select_related(
             'department', 'instructor__user'
-        ).annotate(
-            enrollment_count=Count('enrollments', filter=Q(enrollments__is_active=True))
         )
         
         # Filter by department
@@ -56,7 +77,7 @@ class CourseListView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['departments'] = Department.objects.all()
+        context['departments'] = reference.departments.get()
         context['levels'] = Course.LEVEL_CHOICES
         context['semesters'] = Course.SEMESTER_CHOICES
         context['filters'] = {
@@ -67,12 +88,52 @@ class CourseListView(ListView):
         }
         return context
 
-class CourseDetailView(DetailView):
+class CourseDetailView(ConditionalGetMixin, DetailView):
     """Detail view for individual course"""
     model = Course
     template_name = 'courses/course_detail.html'
     context_object_name = 'course'
     
+    def get_validators(self):
+        # Materials, assignments and prerequisites touch the course's
+        # updated_at when they change (see courses.signals); the instructor
+        # and department are rendered too but have no timestamp of their
+        # own, so hash the instructor's shown fields and the department stamp
+        course = get_object_or_404(
+            Course.objects.values(
+                'updated_at', 'seats_taken', 'instructor__user__first_name',
+                'instructor__user__last_name', 'instructor__designation',
+            ),
+            pk=self.kwargs['pk']
+        )
+        return [*course.values(), reference.departments.version(), *self.viewer_state()], None
+    
+    def viewer_state(self):
+        """What the enroll controls depend on for the requesting student"""
+        if not self.request.user.is_authenticated:
+            return []
+        student_id = StudentProfile.objects.filter(user=self.request.user).values_list('pk', flat=True).first()
+        if student_id is None:
+            return ['not-a-student']
+        
+        course_id = self.kwargs['pk']
+        enrollment = Enrollment.objects.filter(
+            student_id=student_id, course_id=course_id
+        ).values_list('is_active', 'status').first()
+        request_status = EnrollmentRequest.objects.filter(
+            student_id=student_id, course_id=course_id
+        ).order_by('-created_at').values_list('status', flat=True).first()
+        completed_prerequisites = list(
+            Enrollment.objects.filter(
+                student_id=student_id,
+                status='completed',
+                course_id__in=CoursePrerequisiteClosure.objects.filter(
+                    course_id=course_id
+                ).values('prerequisite_id')
+            ).order_by('course_id').values_list('course_id', flat=True)
+        )
+        return [enrollment, request_status, completed_prerequisites]
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         course = self.get_object()
@@ -98,7 +159,12 @@ class CourseDetailView(DetailView):
         
         return context
 
-class EnrollView(LoginRequiredMixin, TemplateView):
+class EnrollmentResponseMixin(ActionResponseMixin):
+    object_name = 'course'
+    spots_left_name = 'seats_left'
+    detail_url_name = 'courses:course_detail'
+
+class EnrollView(EnrollmentResponseMixin, LoginRequiredMixin, TemplateView):
     """View for enrolling in a course"""
     
     def post(self, request, pk):
@@ -107,26 +173,35 @@ class EnrollView(LoginRequiredMixin, TemplateView):
         try:
             student_profile = StudentProfile.objects.get(user=request.user)
         except StudentProfile.DoesNotExist:
-            messages.error(request, 'Only students can enroll in courses.')
-            return redirect('courses:course_detail', pk=pk)
+            return self.respond(course, messages.ERROR, 'Only students can enroll in courses.',
+                                enrolled=False, status=403)
         
-        # Check if already enrolled
-        if Enrollment.objects.filter(student=student_profile, course=course, is_active=True).exists():
-            messages.warning(request, 'You are already enrolled in this course.')
-            return redirect('courses:course_detail', pk=pk)
+        missing = missing_prerequisites(student_profile, course)
+        if missing:
+            codes = ', '.join(prerequisite.code for prerequisite in missing)
+            return self.respond(course, messages.ERROR,
+                                f'You must complete the prerequisites first: {codes}.',
+                                enrolled=False, status=409)
         
-        # Check if course is full
-        if course.is_full:
-            messages.error(request, 'This course is full.')
-            return redirect('courses:course_detail', pk=pk)
+        if settings.ENROLLMENT_QUEUE_ENABLED:
+            enrollment_request = queue_enrollment(student_profile, course)
+            return self.respond(
+                course, messages.INFO,
+                f'Your enrollment request for {course.name} has been received and will be processed shortly.',
+                enrolled=False, status=202, status_url=enrollment_request.get_absolute_url()
+            )
         
-        # Create enrollment
-        Enrollment.objects.create(student=student_profile, course=course)
-        messages.success(request, f'Successfully enrolled in {course.name}!')
+        try:
+            enroll_student(student_profile, course)
+        except EnrollmentError as e:
+            already_enrolled = Enrollment.objects.filter(
+                student=student_profile, course=course, is_active=True
+            ).exists()
+            return self.respond(course, messages.ERROR, str(e), enrolled=already_enrolled, status=409)
         
-        return redirect('courses:course_detail', pk=pk)
+        return self.respond(course, messages.SUCCESS, f'Successfully enrolled in {course.name}!', enrolled=True)
 
-class UnenrollView(LoginRequiredMixin, TemplateView):
+class UnenrollView(EnrollmentResponseMixin, LoginRequiredMixin, TemplateView):
     """View for unenrolling from a course"""
     
     def post(self, request, pk):
@@ -134,19 +209,29 @@ class UnenrollView(LoginRequiredMixin, TemplateView):
         
         try:
             student_profile = StudentProfile.objects.get(user=request.user)
-            enrollment = Enrollment.objects.get(
-                student=student_profile,
-                course=course,
-                is_active=True
-            )
-            enrollment.is_active = False
-            enrollment.status = 'dropped'
-            enrollment.save()
-            messages.success(request, f'Successfully unenrolled from {course.name}.')
-        except (StudentProfile.DoesNotExist, Enrollment.DoesNotExist):
-            messages.error(request, 'You are not enrolled in this course.')
-        
-        return redirect('courses:course_detail', pk=pk)
+            unenroll_student(student_profile, course)
+        except (StudentProfile.DoesNotExist, EnrollmentError):
+            return self.respond(course, messages.ERROR, 'You are not enrolled in this course.',
+                                enrolled=False, status=409)
+        
+        return self.respond(course, messages.SUCCESS, f'Successfully unenrolled from {course.name}.', enrolled=False)
+
+class EnrollmentRequestStatusView(LoginRequiredMixin, View):
+    """JSON status of a queued enrollment request, for polling"""
+    
+    def get(self, request, pk):
+        enrollment_request = get_object_or_404(
+            EnrollmentRequest.objects.select_related('course'),
+            pk=pk,
+            student__user=request.user
+        )
+        return JsonResponse({
+            'id': enrollment_request.pk,
+            'course': enrollment_request.course_id,
+            'status': enrollment_request.status,
+            'message': enrollment_request.message,
+            'seats_left': enrollment_request.course.available_spots,
+        })
 
 class MyCoursesView(LoginRequiredMixin, TemplateView):
     """View for student's enrolled courses"""
@@ -175,8 +260,9 @@ class DepartmentListView(ListView):
     context_object_name = 'departments'
     
     def get_queryset(self):
-        return Department.objects.annotate(
-            course_count=Count('course', filter=Q(course__is_active=True))
+        # Counters are maintained by main.statistics; no per-request COUNT
+        return Department.objects.select_related('statistics').annotate(
+            course_count=Coalesce(F('statistics__active_courses'), 0)
         )
 
 class DepartmentDetailView(DetailView):
@@ -195,5 +281,6 @@ class DepartmentDetailView(DetailView):
         ).select_related('instructor__user')
         
         context['faculty'] = department.faculty_set.all().select_related('user')
+        context['statistics'] = DepartmentStatistics.objects.filter(department=department).first()
         
         return context
\ No newline at end of file
@@ -2,15 +2,16 @@
 Admin configuration for events app
 """
 from django.contrib import admin
-from .models import Event, Announcement, EventRegistration
+from .models import Event, Announcement, ArchivedAnnouncement, EventRegistration
+from .services import recount_registrations
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     """Admin interface for events"""
-    list_display = ['title', 'event_type', 'start_date', 'location', 'organizer', 'is_featured', 'is_published']
+    list_display = ['title', 'event_type', 'start_date', 'location', 'organizer', 'registration_count', 'is_featured', 'is_published']
     list_filter = ['event_type', 'is_featured', 'is_published', 'start_date', 'department']
     search_fields = ['title', 'description', 'location']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['registration_count', 'created_at', 'updated_at']
     ordering = ['-start_date']
     
     fieldsets = (
@@ -21,7 +22,7 @@ class EventAdmin(admin.ModelAdmin):
             'fields': ('start_date', 'end_date', 'location')
         }),
         ('Registration', {
-            'fields': ('registration_required', 'registration_deadline', 'max_participants')
+            'fields': ('registration_required', 'registration_deadline', 'max_participants', 'registration_count')
         }),
         ('Contact Information', {
             'fields': ('contact_email', 'contact_phone')
@@ -34,6 +35,13 @@ class EventAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         })
     )
+    
+    actions = ['recount_event_registrations']
+    
+    def recount_event_registrations(self, request, queryset):
+        updated = recount_registrations(queryset)
+        self.message_user(request, f"Recounted registrations for {updated} event(s).")
+    recount_event_registrations.short_description = "Recount registrations from registration rows"
 
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
@@ -60,6 +68,15 @@ class AnnouncementAdmin(admin.ModelAdmin):
         })
     )
 
+@admin.register(ArchivedAnnouncement)
+class ArchivedAnnouncementAdmin(admin.ModelAdmin):
+    """Admin interface for archived announcements"""
+    list_display = ['title', 'author', 'priority', 'expiry_date', 'archived_at']
+    list_filter = ['priority', 'archived_at', 'department']
+    search_fields = ['title', 'content', 'target_audience']
+    readonly_fields = ['original_id', 'created_at', 'updated_at', 'archived_at']
+    ordering = ['-expiry_date']
+
 @admin.register(EventRegistration)
 class EventRegistrationAdmin(admin.ModelAdmin):
     """Admin interface for event registrations"""
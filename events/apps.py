@@ -0,0 +1,12 @@
+"""
+App configuration for events app
+"""
+from django.apps import AppConfig
+
+
+class EventsConfig(AppConfig):
+    """Events app configuration; wires up model signal handlers"""
+    name = 'events'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,163 @@
+"""
+Calendar windows over published events
+
+Events are fetched by month window with an overlap condition
+(``start_date < window end`` and ``end_date >= window start``), so
+multi-day events that began earlier still show up, and the range scan can
+use the ``start_date`` index. Each month's events are cached as plain dicts
+until an event overlapping that month changes (see ``events.signals``).
+Day buckets are built from the cached rows in a single pass.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from main import caching
+
+from .models import Event
+
+VERSION_NAME = 'calendar'
+KEY_PREFIX = 'calendar:'
+
+# Longest range the JSON endpoint will serve in one request
+MAX_RANGE_DAYS = 92
+
+
+def to_aware(day):
+    """Midnight at the start of ``day`` in the current time zone"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def months_between(first_day, last_day):
+    """Yield the first day of every month from ``first_day`` to ``last_day`` inclusive"""
+    month = month_start(first_day)
+    while month <= last_day:
+        yield month
+        month = next_month(month)
+
+
+def _serialize(event):
+    return {
+        'id': event.pk,
+        'title': event.title,
+        'url': event.get_absolute_url(),
+        'event_type': event.event_type,
+        'event_type_display': event.get_event_type_display(),
+        'location': event.location,
+        'start': timezone.localtime(event.start_date),
+        'end': timezone.localtime(event.end_date),
+        'is_featured': event.is_featured,
+    }
+
+
+def _month_key(month):
+    return f"{KEY_PREFIX}{caching.get_version(VERSION_NAME)}:{month:%Y-%m}"
+
+
+def months_events(months):
+    """
+    Cached events overlapping each month, as ``{month: [event, ...]}``
+
+    Months missing from the cache are loaded together with one overlap
+    query spanning all of them, then stored one key per month.
+    """
+    months = list(months)
+    keys = {month: _month_key(month) for month in months}
+    cached = cache.get_many(list(keys.values()))
+    result = {month: cached[key] for month, key in keys.items() if key in cached}
+    missing = [month for month in months if month not in result]
+    if not missing:
+        return result
+
+    loaded = {month: [] for month in missing}
+    start, end = to_aware(missing[0]), to_aware(next_month(missing[-1]))
+    events = Event.objects.filter(
+        is_published=True,
+        start_date__lt=end,
+        end_date__gte=start,
+    ).order_by('start_date', 'pk')
+    for event in events:
+        data = _serialize(event)
+        for month in months_between(data['start'].date(), data['end'].date()):
+            if month in loaded:
+                loaded[month].append(data)
+
+    cache.set_many({keys[month]: value for month, value in loaded.items()}, settings.CALENDAR_CACHE_TIMEOUT)
+    result.update(loaded)
+    return {month: result[month] for month in months}
+
+
+def month_events(month):
+    """Cached list of events overlapping the month starting at ``month``"""
+    return months_events([month])[month]
+
+
+def events_between(first_day, last_day):
+    """Events overlapping ``first_day``..``last_day`` (inclusive), ordered by start"""
+    start, end = to_aware(first_day), to_aware(last_day + timedelta(days=1))
+    seen, events = set(), []
+    for month_list in months_events(months_between(first_day, last_day)).values():
+        for event in month_list:
+            if event['id'] in seen or event['start'] >= end or event['end'] < start:
+                continue
+            seen.add(event['id'])
+            events.append(event)
+    events.sort(key=lambda event: (event['start'], event['id']))
+    return events
+
+
+def last_day_of(event):
+    """
+    The last day an event occupies; an end at midnight belongs to the day
+    before, so an event ending at 00:00 does not spill into the next day
+    """
+    end = event['end']
+    if end > event['start']:
+        end -= timedelta(microseconds=1)
+    return end.date()
+
+
+def bucket_by_day(events, first_day, last_day):
+    """
+    Map every day from ``first_day`` to ``last_day`` to the events on it
+
+    One pass over the events; a multi-day event is added to each day it
+    covers within the range.
+    """
+    days = {first_day + timedelta(days=offset): [] for offset in range((last_day - first_day).days + 1)}
+    for event in events:
+        day = max(event['start'].date(), first_day)
+        last = min(last_day_of(event), last_day)
+        while day <= last:
+            days[day].append(event)
+            day += timedelta(days=1)
+    return days
+
+
+def invalidate_range(start, end):
+    """Drop the cached months overlapping ``start``..``end`` (datetimes)"""
+    first_day = timezone.localtime(start).date()
+    last_day = timezone.localtime(max(start, end)).date()
+    cache.delete_many([_month_key(month) for month in months_between(first_day, last_day)])
+
+
+def invalidate_all():
+    caching.bump_version(VERSION_NAME)
+
+
+def parse_day(value):
+    """Parse an ISO date (``YYYY-MM-DD``), returning None when invalid"""
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,74 @@
+"""
+iCalendar (RFC 5545) serialization for event feeds
+
+``feed_lines`` yields the feed one component at a time so it can be
+streamed straight from a queryset iterator.
+"""
+from datetime import timezone as dt_timezone
+
+PRODUCT_ID = '-//International Islamic University Chittagong//Events//EN'
+CHUNK_SIZE = 500
+
+
+def escape_text(value):
+    """Escape a TEXT property value"""
+    return (
+        value.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Fold a content line to 75 octets, continuation lines starting with a space"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split inside a multi-byte character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def event_component(event, url, host):
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:event-{event.pk}@{host}",
+        f"DTSTAMP:{format_datetime(event.updated_at)}",
+        f"LAST-MODIFIED:{format_datetime(event.updated_at)}",
+        f"DTSTART:{format_datetime(event.start_date)}",
+        f"DTEND:{format_datetime(event.end_date)}",
+        f"SUMMARY:{escape_text(event.title)}",
+        f"DESCRIPTION:{escape_text(event.description)}",
+        f"LOCATION:{escape_text(event.location)}",
+        f"CATEGORIES:{escape_text(event.get_event_type_display())}",
+        f"URL:{url}",
+        'END:VEVENT',
+    ]
+    return ''.join(fold(line) for line in lines)
+
+
+def feed_lines(queryset, name, build_url, host):
+    """Yield a VCALENDAR for ``queryset``, one VEVENT at a time"""
+    yield ''.join(fold(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f"PRODID:{PRODUCT_ID}",
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ])
+    for event in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield event_component(event, build_url(event.get_absolute_url()), host)
+    yield fold('END:VCALENDAR')
@@ -0,0 +1,50 @@
+"""
+Move long-expired announcements into the archive table in batches
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import Announcement, ArchivedAnnouncement
+
+
+class Command(BaseCommand):
+    help = 'Archive announcements that expired more than --days days ago (schedule daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ANNOUNCEMENT_ARCHIVE_AFTER_DAYS,
+                            help='Days after expiry before an announcement is archived')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Announcements moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many would be archived')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--days must be non-negative and --batch-size positive.')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = Announcement.objects.filter(expiry_date__lt=cutoff)
+        if options['dry_run']:
+            self.stdout.write(f'{expired.count()} announcement(s) would be archived.')
+            return
+
+        archived = 0
+        while True:
+            # Short transactions keep the write lock brief for live traffic
+            with transaction.atomic():
+                batch = list(expired.order_by('pk')[:options['batch_size']])
+                if not batch:
+                    break
+                ArchivedAnnouncement.objects.bulk_create(
+                    [ArchivedAnnouncement.from_announcement(announcement) for announcement in batch],
+                    ignore_conflicts=True,
+                )
+                # A regular delete so the search index and page cache follow
+                Announcement.objects.filter(pk__in=[announcement.pk for announcement in batch]).delete()
+            archived += len(batch)
+            self.stdout.write(f'Archived {archived} announcement(s)...')
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} announcement(s) expired before {cutoff:%Y-%m-%d}.'))
@@ -0,0 +1,14 @@
+"""
+Rebuild the related-content index for events and announcements
+"""
+from django.core.management.base import BaseCommand
+
+from events import related
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related events and announcements shown on detail pages (schedule nightly)'
+
+    def handle(self, *args, **options):
+        created = related.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Stored {created} related-content link(s).'))
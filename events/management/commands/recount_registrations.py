@@ -0,0 +1,14 @@
+"""
+Recompute each event's registration counter from its registrations
+"""
+from django.core.management.base import BaseCommand
+
+from events.services import recount_registrations
+
+
+class Command(BaseCommand):
+    help = 'Recompute Event.registration_count from event registrations'
+
+    def handle(self, *args, **options):
+        updated = recount_registrations()
+        self.stdout.write(self.style.SUCCESS(f'Recounted registrations for {updated} event(s).'))
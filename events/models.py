@@ -29,6 +29,11 @@ class Event(models.Model):
     max_participants = models.IntegerField(null=True, blank=True)
     registration_required = models.BooleanField(default=False)
     registration_deadline = models.DateTimeField(null=True, blank=True)
+    registration_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Registrations taken; maintained by events.services"
+    )
     contact_email = models.EmailField(blank=True)
     contact_phone = models.CharField(max_length=15, blank=True)
     image = models.ImageField(upload_to='events/images/', blank=True)
@@ -39,6 +44,25 @@ class Event(models.Model):
     
     class Meta:
         ordering = ['-start_date']
+        # Partial indexes: boolean filters are compiled to a bare
+        # "WHERE is_published", which only a matching index condition serves
+        indexes = [
+            models.Index(
+                fields=['start_date'],
+                condition=models.Q(is_published=True),
+                name='event_published_start_idx',
+            ),
+            models.Index(
+                fields=['event_type', 'start_date'],
+                condition=models.Q(is_published=True),
+                name='event_published_type_idx',
+            ),
+            models.Index(
+                fields=['start_date'],
+                condition=models.Q(is_published=True, is_featured=True),
+                name='event_featured_start_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -56,6 +80,26 @@ class Event(models.Model):
         from django.utils import timezone
         now = timezone.now()
         return self.start_date <= now <= self.end_date
+    
+    @property
+    def available_spots(self):
+        if self.max_participants is None:
+            return None
+        return max(self.max_participants - self.registration_count, 0)
+    
+    @property
+    def is_full(self):
+        return self.max_participants is not None and self.registration_count >= self.max_participants
+    
+    @property
+    def registration_open(self):
+        from django.utils import timezone
+        now = timezone.now()
+        return (
+            self.registration_required
+            and self.start_date > now
+            and (self.registration_deadline is None or self.registration_deadline >= now)
+        )
 
 class Announcement(models.Model):
     """Model for university announcements"""
@@ -84,6 +128,15 @@ class Announcement(models.Model):
     
     class Meta:
         ordering = ['-is_pinned', '-created_at']
+        indexes = [
+            models.Index(
+                fields=['is_pinned', 'created_at'],
+                condition=models.Q(is_published=True),
+                name='announcement_published_idx',
+            ),
+            # Archival scans by expiry
+            models.Index(fields=['expiry_date'], name='announcement_expiry_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -97,6 +150,51 @@ class Announcement(models.Model):
         if self.expiry_date:
             return timezone.now() <= self.expiry_date
         return True
+    
+    @staticmethod
+    def active_filter(now=None):
+        """The SQL equivalent of ``is_active``, for filtering querysets"""
+        from django.utils import timezone
+        now = now or timezone.now()
+        return models.Q(expiry_date__isnull=True) | models.Q(expiry_date__gte=now)
+
+class ArchivedAnnouncement(models.Model):
+    """Long-expired announcement moved out of the live table by archive_announcements"""
+    original_id = models.PositiveIntegerField(unique=True)
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_announcements')
+    department = models.ForeignKey(
+        Department, on_delete=models.CASCADE, null=True, blank=True, related_name='archived_announcements'
+    )
+    priority = models.CharField(max_length=10, choices=Announcement.PRIORITY_CHOICES)
+    target_audience = models.CharField(max_length=100)
+    expiry_date = models.DateTimeField(null=True, blank=True)
+    attachment = models.FileField(upload_to='announcements/', blank=True)
+    is_published = models.BooleanField(default=True)
+    is_pinned = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    # Fields copied verbatim from Announcement when a row is archived
+    COPIED_FIELDS = [
+        'title', 'content', 'author_id', 'department_id', 'priority', 'target_audience',
+        'expiry_date', 'attachment', 'is_published', 'is_pinned', 'created_at', 'updated_at',
+    ]
+    
+    class Meta:
+        ordering = ['-expiry_date']
+    
+    def __str__(self):
+        return self.title
+    
+    @classmethod
+    def from_announcement(cls, announcement):
+        return cls(
+            original_id=announcement.pk,
+            **{name: getattr(announcement, name) for name in cls.COPIED_FIELDS}
+        )
 
 class EventRegistration(models.Model):
     """Model for event registrations"""
@@ -111,4 +209,30 @@ class EventRegistration(models.Model):
         ordering = ['-registration_date']
     
     def __str__(self):
-        return f"{self.user.get_full_name()} - {self.event.title}"
\ No newline at end of file
+        return f"{self.user.get_full_name()} - {self.event.title}"
+
+class RelatedItem(models.Model):
+    """Precomputed nearest neighbour of an event or announcement, maintained by events.related"""
+    KIND_EVENT = 'event'
+    KIND_ANNOUNCEMENT = 'announcement'
+    
+    KIND_CHOICES = [
+        (KIND_EVENT, 'Event'),
+        (KIND_ANNOUNCEMENT, 'Announcement'),
+    ]
+    
+    kind = models.CharField(max_length=15, choices=KIND_CHOICES)
+    source_id = models.PositiveIntegerField()
+    target_id = models.PositiveIntegerField()
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['kind', 'source_id', '-score']
+        unique_together = ['kind', 'source_id', 'target_id']
+        indexes = [
+            models.Index(fields=['kind', 'source_id', '-score'], name='related_source_score_idx'),
+            models.Index(fields=['kind', 'target_id'], name='related_target_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind}:{self.source_id} -> {self.target_id} ({self.score:.3f})"
@@ -0,0 +1,338 @@
+"""
+Related-content index for event and announcement detail pages
+
+Titles and descriptions are turned into TF-IDF vectors (weighted like the
+search index, see ``main.search``) and each item's ``RELATED_COUNT`` most
+similar items of the same kind are stored as ``RelatedItem`` rows, so a
+detail page reads its neighbours by primary key.
+
+``rebuild`` computes every kind in one batch without comparing all pairs:
+candidates come from per-term "champion lists" (the items weighting a term
+most) and only the best candidates are scored exactly.
+
+``refresh`` recomputes a single saved item and offers it to the neighbours
+it now resembles. Each process keeps the term frequencies and document
+frequencies of every kind in memory (``Corpus``) and patches them for the
+saved item, so a save only vectorizes the items sharing a term with it.
+Neighbour lists may drift slightly from a full rebuild (document
+frequencies change, an item dropped from a full list is not backfilled)
+until the next ``rebuild_related_content`` run.
+"""
+import heapq
+import math
+import threading
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+
+from main import caching
+from main.search import FIELD_WEIGHTS, tokenize
+
+from .models import Announcement, Event, RelatedItem
+
+VERSION_NAME = 'related'
+
+# Neighbours stored per item; detail pages show the first few that are
+# still visible
+RELATED_COUNT = 10
+# Only an item's strongest terms take part in similarity
+MAX_TERMS = 25
+# Items kept per term when gathering rebuild candidates, and candidates
+# per item scored exactly
+CHAMPION_COUNT = 100
+CANDIDATE_COUNT = 3 * RELATED_COUNT
+
+# Fields whose change can alter an item's vector or visibility
+INDEXED_FIELDS = frozenset(['title', 'description', 'content', 'is_published', 'expiry_date'])
+
+CHUNK_SIZE = 500
+
+
+def _get_registry():
+    # kind -> (model, visible items, (title field, body field))
+    return {
+        RelatedItem.KIND_EVENT: (
+            Event,
+            lambda: Event.objects.filter(is_published=True),
+            ('title', 'description'),
+        ),
+        RelatedItem.KIND_ANNOUNCEMENT: (
+            Announcement,
+            lambda: Announcement.objects.filter(Announcement.active_filter(), is_published=True),
+            ('title', 'content'),
+        ),
+    }
+
+
+def kind_for_model(model):
+    """Return the related-content kind for a model class, or None"""
+    for kind, (indexed_model, _queryset, _fields) in _get_registry().items():
+        if issubclass(model, indexed_model):
+            return kind
+    return None
+
+
+def version():
+    return caching.get_version(VERSION_NAME)
+
+
+def term_frequencies(title, body):
+    """Field-weighted, log-dampened term frequencies of one item"""
+    weights = Counter()
+    for field, text in (('title', title), ('body', body)):
+        for term, count in Counter(tokenize(text)).items():
+            weights[term] += FIELD_WEIGHTS[field] * (1 + math.log(count))
+    return weights
+
+
+def load_corpus(kind):
+    """``{pk: term frequencies}`` for every visible item of a kind"""
+    _model, queryset, fields = _get_registry()[kind]
+    return {
+        pk: term_frequencies(title, body)
+        for pk, title, body in queryset().values_list('pk', *fields).iterator(chunk_size=CHUNK_SIZE)
+    }
+
+
+def _idf(count, total):
+    return math.log((1 + total) / (1 + count)) + 1
+
+
+def _vector(frequencies, idf):
+    """Unit-length TF-IDF vector of one item, or None if no term is shared"""
+    weighted = [(term, weight * idf[term]) for term, weight in frequencies.items() if term in idf]
+    weighted = heapq.nlargest(MAX_TERMS, weighted, key=lambda item: item[1])
+    norm = math.sqrt(sum(weight * weight for _term, weight in weighted))
+    if not norm:
+        return None
+    return {term: weight / norm for term, weight in weighted}
+
+
+def vectorize(corpus):
+    """Turn term frequencies into unit-length TF-IDF vectors"""
+    total = len(corpus)
+    document_frequency = Counter()
+    for frequencies in corpus.values():
+        document_frequency.update(frequencies.keys())
+
+    # Terms of a single item cannot relate it to anything
+    idf = {
+        term: _idf(count, total)
+        for term, count in document_frequency.items()
+        if count > 1
+    }
+
+    vectors = {}
+    for pk, frequencies in corpus.items():
+        vector = _vector(frequencies, idf)
+        if vector is not None:
+            vectors[pk] = vector
+    return vectors
+
+
+class Corpus:
+    """Term and document frequencies of one kind's visible items, patched in place"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.stamp_name = f'{VERSION_NAME}:{kind}'
+        self._frequencies = None                  # pk -> term frequencies
+        self._document_frequency = Counter()
+        self._items = defaultdict(set)            # term -> pks using it
+        self._lock = threading.RLock()
+        self._version = None
+
+    def _load(self):
+        version = caching.get_version(self.stamp_name)
+        self._frequencies, self._document_frequency, self._items = {}, Counter(), defaultdict(set)
+        for pk, frequencies in load_corpus(self.kind).items():
+            self._add(pk, frequencies)
+        self._version = version
+
+    def _add(self, pk, frequencies):
+        self._frequencies[pk] = frequencies
+        self._document_frequency.update(frequencies.keys())
+        for term in frequencies:
+            self._items[term].add(pk)
+
+    def _discard(self, pk):
+        frequencies = self._frequencies.pop(pk, None)
+        if frequencies is None:
+            return
+        self._document_frequency.subtract(frequencies.keys())
+        for term in frequencies:
+            self._items[term].discard(pk)
+            if not self._document_frequency[term]:
+                del self._document_frequency[term]
+                del self._items[term]
+
+    def _vector(self, pk):
+        total = len(self._frequencies)
+        # Terms of a single item cannot relate it to anything
+        idf = {
+            term: _idf(self._document_frequency[term], total)
+            for term in self._frequencies[pk]
+            if self._document_frequency[term] > 1
+        }
+        return _vector(self._frequencies[pk], idf)
+
+    def update(self, pk, frequencies):
+        """
+        Replace one item's term frequencies (None drops it) and return its
+        exact similarity to every item sharing one of its terms
+        """
+        with self._lock:
+            # Another process may have changed the corpus since we loaded it
+            if self._frequencies is None or self._version != caching.get_version(self.stamp_name):
+                self._load()
+            self._discard(pk)
+            scores = {}
+            if frequencies is not None:
+                self._add(pk, frequencies)
+                vector = self._vector(pk)
+                others = set().union(*(self._items[term] for term in vector)) if vector else set()
+                others.discard(pk)
+                for other in others:
+                    other_vector = self._vector(other)
+                    score = _cosine(vector, other_vector) if other_vector else 0.0
+                    if score > 0:
+                        scores[other] = score
+            self._advance_version()
+            return scores
+
+    def _advance_version(self):
+        # Our copy stays current only if no other process changed the
+        # corpus since we loaded it
+        loaded = self._version
+        self._version = caching.bump_version(self.stamp_name)
+        if loaded is None or self._version != loaded + 1:
+            self._frequencies = None
+
+    def invalidate(self):
+        caching.bump_version(self.stamp_name)
+
+
+def _postings(vectors, limit=None):
+    """``{term: [(pk, weight), ...]}``, keeping the ``limit`` heaviest items per term"""
+    postings = defaultdict(list)
+    for pk, vector in vectors.items():
+        for term, weight in vector.items():
+            postings[term].append((pk, weight))
+    if limit is not None:
+        for term, items in postings.items():
+            if len(items) > limit:
+                postings[term] = heapq.nlargest(limit, items, key=lambda item: item[1])
+    return postings
+
+
+def _similarities(pk, vector, postings):
+    """Dot product of ``vector`` with every item sharing a term in ``postings``"""
+    scores = defaultdict(float)
+    for term, weight in vector.items():
+        for other, other_weight in postings[term]:
+            if other != pk:
+                scores[other] += weight * other_weight
+    return scores
+
+
+def _cosine(vector, other):
+    if len(other) < len(vector):
+        vector, other = other, vector
+    return sum(weight * other.get(term, 0.0) for term, weight in vector.items())
+
+
+def _neighbours(pk, vectors, champions):
+    """Approximate top neighbours: champion candidates, scored exactly"""
+    vector = vectors[pk]
+    candidates = heapq.nlargest(
+        CANDIDATE_COUNT, _similarities(pk, vector, champions).items(), key=lambda item: item[1]
+    )
+    return _top({other: _cosine(vector, vectors[other]) for other, _partial in candidates})
+
+
+def _top(scores):
+    # Ties go to the older item so results are deterministic
+    return heapq.nlargest(RELATED_COUNT, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+def rebuild(kinds=None):
+    """Recompute the neighbours of every item and return the row count"""
+    created = 0
+    for kind in kinds or _get_registry():
+        # Visibility can change without a save (announcements expire)
+        corpora[kind].invalidate()
+        vectors = vectorize(load_corpus(kind))
+        champions = _postings(vectors, CHAMPION_COUNT)
+        rows = [
+            RelatedItem(kind=kind, source_id=pk, target_id=target_id, score=score)
+            for pk in vectors
+            for target_id, score in _neighbours(pk, vectors, champions)
+        ]
+        with transaction.atomic():
+            RelatedItem.objects.filter(kind=kind).delete()
+            RelatedItem.objects.bulk_create(rows, batch_size=1000)
+        created += len(rows)
+    caching.bump_version(VERSION_NAME)
+    return created
+
+
+def _current_lists(kind, source_ids):
+    """``{source_id: [(score, row pk), ...]}`` for the given sources"""
+    lists = defaultdict(list)
+    source_ids = list(source_ids)
+    for start in range(0, len(source_ids), CHUNK_SIZE):
+        rows = RelatedItem.objects.filter(
+            kind=kind, source_id__in=source_ids[start:start + CHUNK_SIZE]
+        ).values_list('source_id', 'score', 'pk')
+        for source_id, score, row_pk in rows:
+            lists[source_id].append((score, row_pk))
+    return lists
+
+
+def refresh(kind, pk):
+    """Recompute one item's neighbours and its place in other items' lists"""
+    _model, queryset, fields = _get_registry()[kind]
+    row = queryset().filter(pk=pk).values_list(*fields).first()
+    # Exact scores against every item sharing a term
+    scores = corpora[kind].update(pk, term_frequencies(*row) if row else None)
+    with transaction.atomic():
+        RelatedItem.objects.filter(Q(source_id=pk) | Q(target_id=pk), kind=kind).delete()
+        if scores:
+            rows = [
+                RelatedItem(kind=kind, source_id=pk, target_id=target_id, score=score)
+                for target_id, score in _top(scores)
+            ]
+            # Similarity is symmetric: the item joins a neighbour's list if
+            # the list has room or the item beats its weakest entry
+            current, displaced = _current_lists(kind, scores), []
+            for other, score in scores.items():
+                entries = current[other]
+                if len(entries) >= RELATED_COUNT:
+                    weakest = min(entries)
+                    if score <= weakest[0]:
+                        continue
+                    displaced.append(weakest[1])
+                rows.append(RelatedItem(kind=kind, source_id=other, target_id=pk, score=score))
+            for start in range(0, len(displaced), CHUNK_SIZE):
+                RelatedItem.objects.filter(pk__in=displaced[start:start + CHUNK_SIZE]).delete()
+            RelatedItem.objects.bulk_create(rows, batch_size=1000)
+    caching.bump_version(VERSION_NAME)
+
+
+def remove(kind, pk):
+    """Drop an item and every reference to it"""
+    corpora[kind].update(pk, None)
+    RelatedItem.objects.filter(Q(source_id=pk) | Q(target_id=pk), kind=kind).delete()
+    caching.bump_version(VERSION_NAME)
+
+
+def related_to(kind, pk, queryset):
+    """``queryset`` narrowed to the stored neighbours of ``pk``, most similar first"""
+    neighbours = RelatedItem.objects.filter(kind=kind, source_id=pk)
+    return queryset.filter(pk__in=neighbours.values('target_id')).annotate(
+        related_score=Subquery(neighbours.filter(target_id=OuterRef('pk')).values('score')[:1])
+    ).order_by('-related_score', 'pk')
+
+
+corpora = {kind: Corpus(kind) for kind in _get_registry()}
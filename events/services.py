@@ -0,0 +1,83 @@
+"""
+Registration services for events app
+
+A place is claimed with a conditional UPDATE on ``Event.registration_count``
+that also checks the event is open (published, registration required, not
+started, deadline not passed) and not full. The check and the increment are
+one statement inside the transaction that writes the registration row, so
+concurrent requests for the last place are serialized by the write lock and
+an event can never be oversold, nor joined after its deadline.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Event, EventRegistration
+
+
+class RegistrationError(Exception):
+    """Raised when a registration or cancellation cannot be honoured"""
+
+
+def _closed_reason(event, now):
+    """Explain why the claim for ``event`` matched no row"""
+    event.refresh_from_db(fields=[
+        'is_published', 'registration_required', 'registration_deadline',
+        'start_date', 'max_participants', 'registration_count',
+    ])
+    if not event.is_published or not event.registration_required:
+        return 'This event does not take registrations.'
+    if event.start_date <= now:
+        return 'This event has already started.'
+    if event.registration_deadline is not None and event.registration_deadline < now:
+        return 'The registration deadline for this event has passed.'
+    return 'This event is full.'
+
+
+def register_for_event(user, event, notes=''):
+    """Register a user for an event, claiming one place atomically"""
+    with transaction.atomic():
+        now = timezone.now()
+        claimed = Event.objects.filter(
+            Q(registration_deadline__isnull=True) | Q(registration_deadline__gte=now),
+            Q(max_participants__isnull=True) | Q(registration_count__lt=F('max_participants')),
+            pk=event.pk,
+            is_published=True,
+            registration_required=True,
+            start_date__gt=now,
+        ).update(registration_count=F('registration_count') + 1)
+        if not claimed:
+            raise RegistrationError(_closed_reason(event, now))
+
+        # Checked after claiming the place so the event lock is already held;
+        # raising rolls the claim back
+        if EventRegistration.objects.filter(event=event, user=user).exists():
+            raise RegistrationError('You are already registered for this event.')
+        registration = EventRegistration.objects.create(event=event, user=user, notes=notes)
+
+    event.refresh_from_db(fields=['registration_count'])
+    return registration
+
+
+def cancel_registration(user, event):
+    """Cancel a user's registration and release the place"""
+    with transaction.atomic():
+        cancelled, _ = EventRegistration.objects.filter(event=event, user=user).delete()
+        if not cancelled:
+            raise RegistrationError('You are not registered for this event.')
+
+        Event.objects.filter(pk=event.pk, registration_count__gt=0).update(
+            registration_count=F('registration_count') - 1
+        )
+
+    event.refresh_from_db(fields=['registration_count'])
+
+
+def recount_registrations(queryset=None):
+    """Recompute registration_count from registration rows, e.g. after admin edits"""
+    queryset = Event.objects.all() if queryset is None else queryset
+    taken = EventRegistration.objects.filter(
+        event=OuterRef('pk')
+    ).values('event').annotate(total=Count('pk')).values('total')
+    return queryset.update(registration_count=Coalesce(Subquery(taken), 0))
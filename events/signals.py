@@ -0,0 +1,53 @@
+"""
+Signal handlers for events app
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import calendar, related
+from .models import Announcement, Event
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_dates(sender, instance, raw=False, **kwargs):
+    # The months the event used to cover need invalidating too
+    instance._calendar_before = None
+    if instance.pk and not raw:
+        instance._calendar_before = (
+            Event.objects.filter(pk=instance.pk).values_list('start_date', 'end_date').first()
+        )
+
+
+@receiver(post_save, sender=Event)
+def invalidate_calendar_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_calendar_before', None)
+    if before:
+        calendar.invalidate_range(*before)
+    calendar.invalidate_range(instance.start_date, instance.end_date)
+
+
+@receiver(post_delete, sender=Event)
+def invalidate_calendar_on_delete(sender, instance, **kwargs):
+    calendar.invalidate_range(instance.start_date, instance.end_date)
+
+
+# Related-content index, updated once the change is committed so the
+# in-memory corpus never holds rolled back text
+def refresh_related_content(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not related.INDEXED_FIELDS & set(update_fields)):
+        return
+    kind, pk = related.kind_for_model(sender), instance.pk
+    transaction.on_commit(lambda: related.refresh(kind, pk))
+
+
+def remove_related_content(sender, instance, **kwargs):
+    kind, pk = related.kind_for_model(sender), instance.pk
+    transaction.on_commit(lambda: related.remove(kind, pk))
+
+
+for model in (Event, Announcement):
+    post_save.connect(refresh_related_content, sender=model, dispatch_uid=f'related_refresh_{model.__name__}')
+    post_delete.connect(remove_related_content, sender=model, dispatch_uid=f'related_remove_{model.__name__}')
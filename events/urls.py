@@ -9,7 +9,16 @@ app_name = 'events'
 urlpatterns = [
     path('', views.EventListView.as_view(), name='event_list'),
     path('<int:pk>/', views.EventDetailView.as_view(), name='event_detail'),
+    path('<int:pk>/register/', views.EventRegisterView.as_view(), name='event_register'),
+    path('<int:pk>/cancel/', views.EventCancelRegistrationView.as_view(), name='event_cancel_registration'),
     path('calendar/', views.EventCalendarView.as_view(), name='event_calendar'),
+    path('calendar/<int:year>/', views.EventCalendarView.as_view(), name='event_calendar_year'),
+    path('calendar/<int:year>/<int:month>/', views.EventCalendarView.as_view(), name='event_calendar_month'),
+    path('calendar/<int:year>/week/<int:week>/', views.EventCalendarView.as_view(), name='event_calendar_week'),
+    path('calendar/events/', views.EventCalendarRangeView.as_view(), name='event_calendar_range'),
+    path('feed.ics', views.EventFeedView.as_view(), name='event_feed'),
+    path('feed/department/<str:department>.ics', views.EventFeedView.as_view(), name='event_feed_department'),
+    path('feed/type/<str:event_type>.ics', views.EventFeedView.as_view(), name='event_feed_type'),
     path('announcements/', views.AnnouncementListView.as_view(), name='announcement_list'),
     path('announcements/<int:pk>/', views.AnnouncementDetailView.as_view(), name='announcement_detail'),
 ]
\ No newline at end of file
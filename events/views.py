@@ -1,21 +1,49 @@
 """
 Events app views for events and announcements
 """
+from datetime import date, timedelta
+
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
-from django.views.generic import ListView, DetailView, TemplateView
-from django.db.models import Q
+from django.urls import reverse
+from django.views.generic import ListView, DetailView, TemplateView, View
+from django.db.models import Count, Max, Q
 from django.utils import timezone
 from django.core.paginator import Paginator
 
-from .models import Event, Announcement, EventRegistration
-from accounts.models import Department
+from . import calendar, ical, related
+from .models import Event, Announcement, EventRegistration, RelatedItem
+from .services import RegistrationError, cancel_registration, register_for_event
+from main import reference
+from main.http import ActionResponseMixin, ConditionalGetMixin, filter_signature
+from main.pagination import CursorPaginationMixin
+
+def _hour_bucket():
+    # Time filters ("upcoming", "ongoing", expiry) move as the clock does,
+    # so list validators also change once an hour
+    return timezone.now().strftime('%Y%m%d%H')
 
-class EventListView(ListView):
+class EventListView(ConditionalGetMixin, CursorPaginationMixin, ListView):
     """List view for all events"""
     model = Event
     template_name = 'events/event_list.html'
     context_object_name = 'events'
     paginate_by = 12
+    cursor_ordering = ('-start_date', 'pk')
+    
+    def get_validators(self):
+        # Covers the filtered list and the featured events, which are both
+        # drawn from published events
+        stats = Event.objects.filter(is_published=True).aggregate(
+            latest=Max('updated_at'), total=Count('pk')
+        )
+        parts = [
+            stats['latest'], stats['total'], _hour_bucket(), reference.departments.version(),
+            *filter_signature(self.request, 'type', 'department', 'time', 'search', 'page', 'cursor'),
+        ]
+        return parts, None
     
     def get_queryset(self):
         queryset = Event.objects.filter(is_published=True).select_related(
@@ -57,7 +85,7 @@ class EventListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['event_types'] = Event.EVENT_TYPES
-        context['departments'] = Department.objects.all()
+        context['departments'] = reference.departments.get()
         context['filters'] = {
             'type': self.request.GET.get('type', ''),
             'department': self.request.GET.get('department', ''),
@@ -71,12 +99,29 @@ class EventListView(ListView):
         )[:3]
         return context
 
-class EventDetailView(DetailView):
+class EventDetailView(ConditionalGetMixin, DetailView):
     """Detail view for individual event"""
     model = Event
     template_name = 'events/event_detail.html'
     context_object_name = 'event'
     
+    def get_validators(self):
+        event = get_object_or_404(
+            Event.objects.filter(is_published=True).values(
+                'updated_at', 'registration_count', 'organizer__first_name', 'organizer__last_name'
+            ),
+            pk=self.kwargs['pk']
+        )
+        # Related events change only through a related-index refresh; the
+        # registration counter changes without touching updated_at, and the
+        # organizer and department are edited on their own rows
+        parts = [*event.values(), related.version(), reference.departments.version()]
+        if self.request.user.is_authenticated:
+            parts.append(EventRegistration.objects.filter(
+                event_id=self.kwargs['pk'], user=self.request.user
+            ).exists())
+        return parts, None
+    
     def get_queryset(self):
         return Event.objects.filter(is_published=True)
     
@@ -93,45 +138,233 @@ class EventDetailView(DetailView):
         else:
             context['is_registered'] = False
         
-        # Get related events
-        context['related_events'] = Event.objects.filter(
-            event_type=event.event_type,
-            is_published=True
-        ).exclude(pk=event.pk)[:3]
+        # Get related events from the precomputed index
+        context['related_events'] = related.related_to(
+            RelatedItem.KIND_EVENT, event.pk, Event.objects.filter(is_published=True)
+        )[:3]
         
         return context
 
+class RegistrationResponseMixin(ActionResponseMixin):
+    object_name = 'event'
+    detail_url_name = 'events:event_detail'
+
+class EventRegisterView(RegistrationResponseMixin, LoginRequiredMixin, View):
+    """View for registering for an event"""
+    
+    def post(self, request, pk):
+        event = get_object_or_404(Event, pk=pk, is_published=True)
+        
+        try:
+            register_for_event(request.user, event, notes=request.POST.get('notes', ''))
+        except RegistrationError as e:
+            already_registered = EventRegistration.objects.filter(event=event, user=request.user).exists()
+            return self.respond(event, messages.ERROR, str(e), registered=already_registered, status=409)
+        
+        return self.respond(event, messages.SUCCESS, f'Successfully registered for {event.title}!', registered=True)
+
+class EventCancelRegistrationView(RegistrationResponseMixin, LoginRequiredMixin, View):
+    """View for cancelling an event registration"""
+    
+    def post(self, request, pk):
+        event = get_object_or_404(Event, pk=pk)
+        
+        try:
+            cancel_registration(request.user, event)
+        except RegistrationError as e:
+            return self.respond(event, messages.ERROR, str(e), registered=False, status=409)
+        
+        return self.respond(event, messages.SUCCESS, f'Your registration for {event.title} was cancelled.',
+                            registered=False)
+
 class EventCalendarView(TemplateView):
-    """Calendar view for events"""
+    """Calendar view for events by year, month or ISO week"""
     template_name = 'events/event_calendar.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        today = timezone.localdate()
+        year = self.kwargs.get('year')
         
-        # Get events for the current month
-        now = timezone.now()
-        events = Event.objects.filter(
-            is_published=True,
-            start_date__year=now.year,
-            start_date__month=now.month
-        ).select_related('organizer', 'department')
-        
-        context['events'] = events
-        context['current_month'] = now.strftime('%B %Y')
+        try:
+            if 'week' in self.kwargs:
+                context.update(self.week_context(date.fromisocalendar(year, self.kwargs['week'], 1), today))
+            elif 'month' in self.kwargs:
+                context.update(self.month_context(date(year, self.kwargs['month'], 1), today))
+            elif year is not None:
+                context.update(self.year_context(date(year, 1, 1), today))
+            else:
+                context.update(self.month_context(today.replace(day=1), today))
+        except (ValueError, OverflowError):
+            raise Http404('No such calendar period')
         
+        context['today'] = today
+        context['today_url'] = reverse('events:event_calendar')
         return context
+    
+    def month_context(self, month, today):
+        # Full weeks, Monday to Sunday, around the month
+        grid_first = month - timedelta(days=month.weekday())
+        month_last = calendar.next_month(month) - timedelta(days=1)
+        grid_last = month_last + timedelta(days=6 - month_last.weekday())
+        
+        events = calendar.events_between(grid_first, grid_last)
+        buckets = calendar.bucket_by_day(events, grid_first, grid_last)
+        days = [
+            {'date': day, 'events': day_events, 'in_period': day.month == month.month, 'is_today': day == today}
+            for day, day_events in buckets.items()
+        ]
+        previous = (month - timedelta(days=1)).replace(day=1)
+        following = calendar.next_month(month)
+        return {
+            'period': 'month',
+            'period_label': month.strftime('%B %Y'),
+            'current_month': month.strftime('%B %Y'),
+            'weeks': [days[i:i + 7] for i in range(0, len(days), 7)],
+            'events': [event for event in events if calendar.last_day_of(event) >= month and event['start'].date() <= month_last],
+            'previous_url': reverse('events:event_calendar_month', args=[previous.year, previous.month]),
+            'next_url': reverse('events:event_calendar_month', args=[following.year, following.month]),
+            'year_url': reverse('events:event_calendar_year', args=[month.year]),
+        }
+    
+    def week_context(self, monday, today):
+        sunday = monday + timedelta(days=6)
+        events = calendar.events_between(monday, sunday)
+        buckets = calendar.bucket_by_day(events, monday, sunday)
+        previous, following = monday - timedelta(days=7), monday + timedelta(days=7)
+        year, week, _weekday = monday.isocalendar()
+        return {
+            'period': 'week',
+            'period_label': f"Week {week}, {year} ({monday:%d %b} - {sunday:%d %b})",
+            'days': [
+                {'date': day, 'events': day_events, 'in_period': True, 'is_today': day == today}
+                for day, day_events in buckets.items()
+            ],
+            'events': events,
+            'previous_url': reverse('events:event_calendar_week', args=list(previous.isocalendar()[:2])),
+            'next_url': reverse('events:event_calendar_week', args=list(following.isocalendar()[:2])),
+            'month_url': reverse('events:event_calendar_month', args=[monday.year, monday.month]),
+        }
+    
+    def year_context(self, first_day, today):
+        events = calendar.months_events(calendar.months_between(first_day, first_day.replace(month=12)))
+        months = [
+            {
+                'month': month,
+                'url': reverse('events:event_calendar_month', args=[month.year, month.month]),
+                'event_count': len(month_events),
+            }
+            for month, month_events in events.items()
+        ]
+        return {
+            'period': 'year',
+            'period_label': str(first_day.year),
+            'months': months,
+            'previous_url': reverse('events:event_calendar_year', args=[first_day.year - 1]),
+            'next_url': reverse('events:event_calendar_year', args=[first_day.year + 1]),
+        }
+
+class EventCalendarRangeView(View):
+    """JSON events for a date range, bucketed per day, for calendar widgets"""
+    
+    def get(self, request):
+        # ``start`` is inclusive and ``end`` exclusive, as ISO dates
+        start = calendar.parse_day(request.GET.get('start'))
+        end = calendar.parse_day(request.GET.get('end'))
+        if start is None or end is None or end <= start:
+            return JsonResponse({'message': 'Pass start and end as YYYY-MM-DD, with end after start.'}, status=400)
+        if (end - start).days > calendar.MAX_RANGE_DAYS:
+            return JsonResponse(
+                {'message': f'Ranges are limited to {calendar.MAX_RANGE_DAYS} days.'}, status=400
+            )
+        
+        last_day = end - timedelta(days=1)
+        events = calendar.events_between(start, last_day)
+        buckets = calendar.bucket_by_day(events, start, last_day)
+        return JsonResponse({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'events': [
+                {**event, 'start': event['start'].isoformat(), 'end': event['end'].isoformat()}
+                for event in events
+            ],
+            'days': [
+                {'date': day.isoformat(), 'events': [event['id'] for event in day_events]}
+                for day, day_events in buckets.items()
+            ],
+        })
+
+class EventFeedView(ConditionalGetMixin, View):
+    """Streaming iCalendar feed of published events, by department and type"""
+    
+    def get_filters(self):
+        # Filters come from the URL or, for the combined feed, the query string
+        department = self.kwargs.get('department') or self.request.GET.get('department', '')
+        event_type = self.kwargs.get('event_type') or self.request.GET.get('type', '')
+        if department and department not in {d.code for d in reference.departments.get()}:
+            raise Http404('No such department')
+        if event_type and event_type not in dict(Event.EVENT_TYPES):
+            raise Http404('No such event type')
+        return department, event_type
+    
+    def get_queryset(self):
+        department, event_type = self.get_filters()
+        queryset = Event.objects.filter(is_published=True)
+        if department:
+            queryset = queryset.filter(department__code=department)
+        if event_type:
+            queryset = queryset.filter(event_type=event_type)
+        return queryset
+    
+    def get_validators(self):
+        stats = self.get_queryset().aggregate(latest=Max('updated_at'), total=Count('pk'))
+        parts = [stats['latest'], stats['total'], *self.get_filters()]
+        return parts, None
+    
+    def get(self, request, *args, **kwargs):
+        department, event_type = self.get_filters()
+        name = ' - '.join(filter(None, [
+            'IIUC Events', department, dict(Event.EVENT_TYPES).get(event_type)
+        ]))
+        queryset = self.get_queryset().only(
+            'pk', 'title', 'description', 'event_type', 'location',
+            'start_date', 'end_date', 'updated_at'
+        ).order_by('start_date', 'pk')
+        
+        response = StreamingHttpResponse(
+            ical.feed_lines(queryset, name, request.build_absolute_uri, request.get_host()),
+            content_type='text/calendar; charset=utf-8',
+        )
+        filename = '-'.join(filter(None, ['events', department.lower(), event_type]))
+        response['Content-Disposition'] = f'inline; filename="{filename}.ics"'
+        return response
 
-class AnnouncementListView(ListView):
+class AnnouncementListView(ConditionalGetMixin, CursorPaginationMixin, ListView):
     """List view for all announcements"""
     model = Announcement
     template_name = 'events/announcement_list.html'
     context_object_name = 'announcements'
     paginate_by = 15
+    cursor_ordering = ('-is_pinned', '-created_at', 'pk')
     
-    def get_queryset(self):
-        queryset = Announcement.objects.filter(is_published=True).select_related(
-            'author', 'department'
+    def get_validators(self):
+        # Counting only unexpired announcements changes the validators as
+        # soon as one expires
+        stats = Announcement.objects.filter(Announcement.active_filter(), is_published=True).aggregate(
+            latest=Max('updated_at'), total=Count('pk')
         )
+        parts = [
+            stats['latest'], stats['total'], _hour_bucket(), reference.departments.version(),
+            *filter_signature(self.request, 'priority', 'department', 'search', 'page', 'cursor'),
+        ]
+        return parts, None
+    
+    def get_queryset(self):
+        # Expired announcements are filtered in SQL so they are never
+        # fetched, counted or paginated
+        queryset = Announcement.objects.filter(
+            Announcement.active_filter(), is_published=True
+        ).select_related('author', 'department')
         
         # Filter by priority
         priority = self.request.GET.get('priority')
@@ -157,24 +390,34 @@ class AnnouncementListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['priorities'] = Announcement.PRIORITY_CHOICES
-        context['departments'] = Department.objects.all()
+        context['departments'] = reference.departments.get()
         context['filters'] = {
             'priority': self.request.GET.get('priority', ''),
             'department': self.request.GET.get('department', ''),
             'search': self.request.GET.get('search', ''),
         }
         context['pinned_announcements'] = Announcement.objects.filter(
+            Announcement.active_filter(),
             is_pinned=True,
             is_published=True
         )[:3]
         return context
 
-class AnnouncementDetailView(DetailView):
+class AnnouncementDetailView(ConditionalGetMixin, DetailView):
     """Detail view for individual announcement"""
     model = Announcement
     template_name = 'events/announcement_detail.html'
     context_object_name = 'announcement'
     
+    def get_validators(self):
+        announcement = get_object_or_404(
+            Announcement.objects.filter(is_published=True).values('updated_at'), pk=self.kwargs['pk']
+        )
+        # Related announcements change through a related-index refresh or
+        # by expiring
+        parts = [announcement['updated_at'], related.version(), _hour_bucket()]
+        return parts, None
+    
     def get_queryset(self):
         return Announcement.objects.filter(is_published=True)
     
@@ -182,10 +425,10 @@ class AnnouncementDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         announcement = self.get_object()
         
-        # Get related announcements
-        context['related_announcements'] = Announcement.objects.filter(
-            department=announcement.department,
-            is_published=True
-        ).exclude(pk=announcement.pk)[:3]
+        # Get related announcements from the precomputed index
+        context['related_announcements'] = related.related_to(
+            RelatedItem.KIND_ANNOUNCEMENT, announcement.pk,
+            Announcement.objects.filter(Announcement.active_filter(), is_published=True)
+        )[:3]
         
         return context
\ No newline at end of file
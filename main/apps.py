@@ -0,0 +1,12 @@
+"""
+App configuration for main app
+"""
+from django.apps import AppConfig
+
+
+class MainConfig(AppConfig):
+    """Main app configuration; wires up model signal handlers"""
+    name = 'main'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,50 @@
+"""
+Shared cache helpers
+
+Version stamps live in the default cache so every worker process can tell
+when data it holds in memory was changed by another process. A stamp that
+was evicted is re-seeded from the clock, never from a constant, so a copy
+built before the eviction cannot look current again; stamps are only ever
+compared for equality.
+``get_or_build`` memoizes arbitrary values, including ``None``.
+"""
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = 'version:'
+
+
+def get_version(name):
+    """Return the current version stamp for a named dataset"""
+    version = cache.get(VERSION_KEY_PREFIX + name)
+    if version is None:
+        # Stamps never expire on their own; seed one so that all processes
+        # agree on a starting point
+        seed = time.time_ns()
+        cache.add(VERSION_KEY_PREFIX + name, seed, timeout=None)
+        version = cache.get(VERSION_KEY_PREFIX + name, seed)
+    return version
+
+
+def bump_version(name):
+    """Mark a named dataset as changed and return the new stamp"""
+    key = VERSION_KEY_PREFIX + name
+    try:
+        return cache.incr(key)
+    except ValueError:
+        seed = time.time_ns()
+        cache.add(key, seed, timeout=None)
+        return cache.get(key, seed)
+
+
+_MISSING = object()
+
+
+def get_or_build(key, builder, timeout):
+    """Return the cached value for ``key``, building and storing it on a miss"""
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = builder()
+        cache.set(key, value, timeout)
+    return value
@@ -0,0 +1,24 @@
+"""
+Per-connection SQLite tuning
+"""
+from django.conf import settings
+
+
+def is_read_only(connection):
+    return 'mode=ro' in str(connection.settings_dict['NAME'])
+
+
+def configure_sqlite(connection):
+    """Apply ``settings.SQLITE_PRAGMAS`` to a freshly opened SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    read_only = is_read_only(connection)
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            # The journal mode is stored in the database file and can only
+            # be changed through a writable connection
+            if read_only and name == 'journal_mode':
+                continue
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if read_only:
+            cursor.execute('PRAGMA query_only = ON')
@@ -0,0 +1,52 @@
+"""
+Worker side of the ``import_gallery`` command
+
+Pool workers import this module to decode archive members. It must not
+import models (directly or through ``main`` modules that do): under the
+``spawn`` and ``forkserver`` start methods a worker is a fresh interpreter
+in which the app registry was never populated. Settings are read lazily,
+which only needs ``DJANGO_SETTINGS_MODULE`` inherited from the parent.
+"""
+import posixpath
+import zipfile
+
+from django.conf import settings
+from PIL import Image, UnidentifiedImageError
+
+from . import images
+
+# Each worker process opens the archive once
+_archive = None
+
+
+def open_archive(path):
+    """Pool initializer"""
+    global _archive
+    _archive = zipfile.ZipFile(path)
+
+
+def _title_for(member):
+    stem = posixpath.splitext(posixpath.basename(member))[0]
+    return ' '.join(stem.replace('_', ' ').replace('-', ' ').split()).title()[:200] or 'Untitled'
+
+
+def process_member(member):
+    """Decode one archive member and encode the stored original and its renditions"""
+    try:
+        with _archive.open(member) as source:
+            size = settings.GALLERY_IMPORT_MAX_WIDTH
+            image = images.load_image(source, (size, size))
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError, zipfile.BadZipFile) as e:
+        return {'member': member, 'error': str(e) or e.__class__.__name__}
+
+    # The stored original is capped and re-encoded, which drops EXIF
+    # Renditions are resized from it rather than from the full decode
+    original = images.resize_to_width(image, settings.GALLERY_IMPORT_MAX_WIDTH)
+    image_format, extension = ('PNG', '.png') if image.mode == 'RGBA' else ('JPEG', '.jpg')
+    return {
+        'member': member,
+        'title': _title_for(member),
+        'filename': posixpath.splitext(posixpath.basename(member))[0] + extension,
+        'original': images.encode(original, image_format),
+        'renditions': images.render_renditions(original, image_format),
+    }
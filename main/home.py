@@ -0,0 +1,63 @@
+"""
+Cached home page sections
+
+Each section is materialized (with the related rows its template needs) and
+cached on its own. Signal handlers drop exactly the sections whose source
+models changed, so a warm home page renders without touching the database.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from accounts.models import Department, Faculty
+from courses.models import Course
+from events.models import Event
+
+from . import caching
+from .models import GalleryImage
+
+KEY_PREFIX = 'home:'
+
+
+def _featured_faculty():
+    return list(Faculty.objects.filter(is_featured=True).select_related('user', 'department')[:3])
+
+
+def _recent_events():
+    return list(Event.objects.filter(is_published=True)[:3])
+
+
+def _featured_courses():
+    return list(Course.objects.filter(is_featured=True).select_related('instructor__user')[:6])
+
+
+def _featured_images():
+    return list(GalleryImage.objects.filter(is_featured=True)[:6])
+
+
+# section name -> (builder, models whose changes invalidate it)
+SECTIONS = {
+    'featured_faculty': (_featured_faculty, (Faculty, User, Department)),
+    'recent_events': (_recent_events, (Event,)),
+    'featured_courses': (_featured_courses, (Course, Faculty, User)),
+    'featured_images': (_featured_images, (GalleryImage,)),
+}
+
+
+def get_sections():
+    """Return a context dict with every home page section"""
+    return {
+        name: caching.get_or_build(KEY_PREFIX + name, builder, settings.HOME_CACHE_TIMEOUT)
+        for name, (builder, _models) in SECTIONS.items()
+    }
+
+
+def sections_for_model(model):
+    return [name for name, (_builder, models) in SECTIONS.items() if issubclass(model, models)]
+
+
+def invalidate_for_model(model):
+    """Drop the cached sections that depend on ``model``"""
+    keys = [KEY_PREFIX + name for name in sections_for_model(model)]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,93 @@
+"""
+HTTP helpers shared by the apps' views
+"""
+import calendar
+import hashlib
+
+from django.contrib import messages
+from django.contrib.messages import get_messages
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def wants_json(request):
+    """True when the client asked for JSON rather than an HTML page"""
+    accept = request.headers.get('Accept', '')
+    return 'application/json' in accept and 'text/html' not in accept
+
+
+class ActionResponseMixin:
+    """
+    Answer actions on an object (enrolling, registering...) with a redirect
+    to its detail page and a flash message, or with a compact JSON payload
+    when the client asks for JSON
+
+    Views name the object's payload key (``object_name``), the key of its
+    remaining places (read from ``available_spots``) and the detail URL.
+    """
+    object_name = None
+    spots_left_name = 'spots_left'
+    detail_url_name = None
+    
+    def handle_no_permission(self):
+        if wants_json(self.request):
+            return JsonResponse({'message': 'Please log in to continue.'}, status=401)
+        return super().handle_no_permission()
+    
+    def respond(self, obj, level, message, status=200, **state):
+        if wants_json(self.request):
+            return JsonResponse({
+                self.object_name: obj.pk,
+                **state,
+                self.spots_left_name: obj.available_spots,
+                'message': message,
+            }, status=status)
+        
+        messages.add_message(self.request, level, message)
+        return redirect(self.detail_url_name, pk=obj.pk)
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET/HEAD with ``304 Not Modified`` when the client's validators
+    still match, without building the context or rendering the template
+
+    Views implement ``get_validators()`` and return ``(parts, last_modified)``:
+    ``parts`` are the values the page depends on (they are hashed into the
+    ETag together with the requesting user). ``last_modified`` is sent as
+    Last-Modified and must be None unless the page depends on that timestamp
+    alone: a client sending only If-Modified-Since would otherwise get a
+    stale 304 when per-user state, counters or counts change.
+    """
+    
+    def get_validators(self):
+        raise NotImplementedError
+    
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        
+        parts, last_modified = self.get_validators()
+        key = '|'.join(str(part) for part in [request.user.pk, *parts])
+        etag = quote_etag(hashlib.md5(key.encode('utf-8')).hexdigest())
+        timestamp = calendar.timegm(last_modified.utctimetuple()) if last_modified else None
+        
+        # Pending flash messages have to be rendered, so never skip the page
+        if not len(get_messages(request)):
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is not None:
+                return response
+        
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.headers.setdefault('ETag', etag)
+            if timestamp is not None:
+                response.headers.setdefault('Last-Modified', http_date(timestamp))
+        return response
+
+
+def filter_signature(request, *names):
+    """Normalized query-string values that select what a list page shows"""
+    return [f"{name}={request.GET.get(name, '')}" for name in names]
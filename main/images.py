@@ -0,0 +1,168 @@
+"""
+Fixed-width image renditions for uploaded pictures
+
+Every configured width is written next to the original, as a re-encoded
+copy in the original format and as WebP, under a deterministic name
+(``photo.jpg`` -> ``photo-320w.jpg`` and ``photo-320w.webp``). Widths
+larger than the original are stored at the original size, so every name
+always exists once an image has been processed and templates can build
+``srcset`` without touching the files (see ``main.templatetags.images``).
+
+Renditions are generated when an upload is saved (see ``main.signals``)
+and for existing media by the ``generate_renditions`` command.
+"""
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Pillow format for the re-encoded copy, by original extension; anything
+# else is re-encoded as JPEG
+FORMATS = {
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.png': 'PNG',
+    '.gif': 'PNG',
+    '.webp': 'WEBP',
+}
+
+
+class RenditionError(Exception):
+    """Raised when an original cannot be read as an image"""
+
+
+def image_fields():
+    from accounts.models import Faculty, StudentProfile
+    from events.models import Event
+
+    from .models import GalleryImage
+
+    # model -> image field that gets renditions
+    return {
+        GalleryImage: 'image',
+        Event: 'image',
+        Faculty: 'profile_picture',
+        StudentProfile: 'profile_picture',
+    }
+
+
+def image_field_for_model(model):
+    """Return the name of the model's image field with renditions, or None"""
+    for image_model, field_name in image_fields().items():
+        if issubclass(model, image_model):
+            return field_name
+    return None
+
+
+def widths():
+    return sorted(settings.IMAGE_RENDITION_WIDTHS)
+
+
+def _extension(name):
+    extension = posixpath.splitext(name)[1].lower()
+    return extension if extension in FORMATS else '.jpg'
+
+
+def rendition_name(name, width, webp=False):
+    """Storage name of the ``width`` rendition of the file stored as ``name``"""
+    stem = posixpath.splitext(name)[0]
+    return f"{stem}-{width}w{'.webp' if webp else _extension(name)}"
+
+
+def rendition_names(name):
+    """Every rendition name of the file stored as ``name``"""
+    return [
+        rendition_name(name, width, webp)
+        for width in widths()
+        for webp in (False, True)
+    ]
+
+
+def has_renditions(field_file):
+    # The largest WebP is written last, so it marks a complete set
+    return field_file.storage.exists(rendition_name(field_file.name, widths()[-1], webp=True))
+
+
+def format_for(name):
+    """Pillow format used to re-encode the file stored as ``name``"""
+    return FORMATS[_extension(name)]
+
+
+def load_image(source, draft_size=None):
+    """Decode an image upright (EXIF orientation applied), in RGB or RGBA"""
+    image = Image.open(source)
+    if draft_size:
+        # Let the JPEG decoder scale down while decoding
+        image.draft('RGB', draft_size)
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    return image
+
+
+def encode(image, image_format):
+    """Encode ``image``; metadata such as EXIF is not carried over"""
+    buffer = BytesIO()
+    if image_format == 'JPEG':
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(buffer, 'JPEG', quality=settings.IMAGE_RENDITION_QUALITY, optimize=True, progressive=True)
+    elif image_format == 'WEBP':
+        image.save(buffer, 'WEBP', quality=settings.IMAGE_RENDITION_QUALITY, method=4)
+    else:
+        image.save(buffer, image_format, optimize=True)
+    return buffer.getvalue()
+
+
+def resize_to_width(image, width):
+    """``image`` scaled down to ``width`` pixels wide; never scaled up"""
+    if image.width <= width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    # reducing_gap shrinks by whole factors first, which is much faster on
+    # camera-sized originals and visually the same
+    return image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+
+def render_renditions(image, image_format):
+    """Encode every rendition of ``image`` as ``[(width, webp, content), ...]``"""
+    renditions = []
+    # Largest first, each width resized from the one before
+    for width in reversed(widths()):
+        image = resize_to_width(image, width)
+        # A WebP original has a single name per width
+        if image_format != 'WEBP':
+            renditions.append((width, False, encode(image, image_format)))
+        renditions.append((width, True, encode(image, 'WEBP')))
+    return renditions
+
+
+def _store(storage, name, content):
+    # Replace in place so the name stays deterministic
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def store_renditions(storage, name, renditions):
+    """Save ``render_renditions`` output for the file stored as ``name``"""
+    # Largest last, so has_renditions only sees complete sets
+    for width, webp, content in sorted(renditions, key=lambda rendition: (rendition[0], rendition[1])):
+        _store(storage, rendition_name(name, width, webp), content)
+    return len(renditions)
+
+
+def generate_renditions(field_file):
+    """Write every rendition of ``field_file`` and return how many files were stored"""
+    storage, name = field_file.storage, field_file.name
+    largest = widths()[-1]
+    try:
+        with storage.open(name, 'rb') as source:
+            image = load_image(source, (largest, largest))
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as e:
+        raise RenditionError(f"{name}: {e}") from e
+    return store_renditions(storage, name, render_renditions(image, format_for(name)))
@@ -0,0 +1,241 @@
+"""
+Benchmark every named route through the test client
+"""
+import json
+import math
+import platform
+import subprocess
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils.http import urlencode
+
+from main.queries import QueryRecorder
+
+APP_NAMESPACES = ('main', 'accounts', 'courses', 'events')
+
+# Routes that change session state or need one-off tokens
+SKIPPED_ROUTES = {'accounts:logout', 'accounts:password_reset_confirm'}
+
+COMPARED_METRICS = ('p50_ms', 'p95_ms')
+
+
+def sample_queries():
+    """Query strings for routes that do little or nothing without one"""
+    today = date.today()
+    return {
+        'main:search': {'q': 'intro'},
+        'main:search_suggest': {'q': 'in'},
+        'events:event_calendar_range': {
+            'start': today.replace(day=1).isoformat(),
+            'end': (today.replace(day=1) + timedelta(days=42)).isoformat(),
+        },
+    }
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def named_routes():
+    """Yield (url name, pattern) for every named route of the local apps"""
+    for resolver in get_resolver().url_patterns:
+        if not isinstance(resolver, URLResolver) or resolver.namespace not in APP_NAMESPACES:
+            continue
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                yield f"{resolver.namespace}:{pattern.name}", pattern
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Measure latency percentiles and query counts for every named route'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Measured requests per route')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per route')
+        parser.add_argument('--user', help='Username to log in as for authenticated routes')
+        parser.add_argument('--route', action='append', help='Only benchmark these URL names')
+        parser.add_argument('--page-cache', action='store_true', help='Keep the anonymous page cache enabled')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+        parser.add_argument('--compare', help='Earlier results file to compare against')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='Percent slowdown reported as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        overrides = {'QUERY_INSPECTOR_ENABLED': False, 'DEBUG': False}
+        if not options['page_cache']:
+            overrides['PAGE_CACHE_URL_NAMES'] = []
+        overrides['ALLOWED_HOSTS'] = list(settings.ALLOWED_HOSTS) + ['testserver']
+
+        with override_settings(**overrides):
+            client = Client(raise_request_exception=False)
+            if options['user']:
+                from django.contrib.auth.models import User
+                user = User.objects.filter(username=options['user']).first()
+                if user is None:
+                    raise CommandError(f"User '{options['user']}' does not exist.")
+                client.force_login(user)
+            routes = self.run_routes(client, options)
+
+        results = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'database': settings.DATABASES['default']['ENGINE'],
+            'requests': options['requests'],
+            'user': options['user'],
+            'page_cache': options['page_cache'],
+            'routes': routes,
+        }
+        self.print_table(routes)
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2, sort_keys=True))
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['compare']:
+            regressions = self.compare(options['compare'], routes, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f'{regressions} regression(s) found.')
+
+    def sample_kwargs(self, pattern):
+        """Build URL kwargs: today for dates, the first department or event type, the middle row for pk"""
+        from accounts.models import Department
+        from events.models import Event
+
+        today = date.today()
+        kwargs = {}
+        for name in pattern.pattern.converters:
+            if name == 'year':
+                kwargs[name] = today.year
+            elif name == 'month':
+                kwargs[name] = today.month
+            elif name == 'week':
+                kwargs[name] = today.isocalendar()[1]
+            elif name == 'department':
+                kwargs[name] = Department.objects.order_by('code').values_list('code', flat=True).first()
+            elif name == 'event_type':
+                kwargs[name] = Event.EVENT_TYPES[0][0]
+            elif name == 'pk':
+                kwargs[name] = self.sample_pk(pattern)
+            else:
+                return None
+            if kwargs[name] is None:
+                return None
+        return kwargs
+
+    def sample_pk(self, pattern):
+        """The middle primary key of the view's model, or None"""
+        model = getattr(getattr(pattern.callback, 'view_class', None), 'model', None)
+        if model is None:
+            return None
+        pks = model._default_manager.order_by('pk').values_list('pk', flat=True)
+        count = pks.count()
+        if not count:
+            return None
+        return pks[count // 2]
+
+    def run_routes(self, client, options):
+        routes, queries_by_route = {}, sample_queries()
+        for name, pattern in named_routes():
+            if name in SKIPPED_ROUTES or (options['route'] and name not in options['route']):
+                continue
+            kwargs = self.sample_kwargs(pattern)
+            if kwargs is None:
+                self.stdout.write(f'Skipping {name}: no sample object for its URL arguments')
+                continue
+            url = reverse(name, kwargs=kwargs)
+            data = queries_by_route.get(name, {})
+
+            for _ in range(options['warmup']):
+                response = client.get(url, data)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+
+            timings, queries, status = [], [], None
+            for _ in range(options['requests']):
+                with QueryRecorder() as recorder:
+                    start = time.perf_counter()
+                    response = client.get(url, data)
+                    # Streaming views do their work while the body is read
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries.append(recorder.count)
+                status = response.status_code
+
+            timings.sort()
+            routes[name] = {
+                'url': f'{url}?{urlencode(data)}' if data else url,
+                'status': status,
+                'mean_ms': round(sum(timings) / len(timings), 2),
+                'p50_ms': round(percentile(timings, 0.50), 2),
+                'p90_ms': round(percentile(timings, 0.90), 2),
+                'p95_ms': round(percentile(timings, 0.95), 2),
+                'p99_ms': round(percentile(timings, 0.99), 2),
+                'max_ms': round(timings[-1], 2),
+                'queries': max(queries),
+            }
+        return routes
+
+    def print_table(self, routes):
+        self.stdout.write(f"{'route':40} {'status':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8}")
+        for name, result in sorted(routes.items()):
+            self.stdout.write(
+                f"{name:40} {result['status']:>6} {result['p50_ms']:>9.2f} "
+                f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['queries']:>8}"
+            )
+
+    def compare(self, path, routes, threshold):
+        """Print differences against an earlier run and return the regression count"""
+        try:
+            baseline = json.loads(Path(path).read_text())['routes']
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'Cannot read baseline {path}: {error}')
+
+        regressions = 0
+        self.stdout.write(f'\nCompared with {path}:')
+        for name, result in sorted(routes.items()):
+            before = baseline.get(name)
+            if before is None:
+                self.stdout.write(f'  {name}: new route')
+                continue
+            problems = []
+            for metric in COMPARED_METRICS:
+                if before[metric] and result[metric] > before[metric] * (1 + threshold / 100):
+                    change = (result[metric] / before[metric] - 1) * 100
+                    problems.append(f"{metric} {before[metric]:.2f} -> {result[metric]:.2f} (+{change:.0f}%)")
+            if result['queries'] > before['queries']:
+                problems.append(f"queries {before['queries']} -> {result['queries']}")
+            if result['status'] != before['status']:
+                problems.append(f"status {before['status']} -> {result['status']}")
+            if problems:
+                regressions += 1
+                self.stdout.write(self.style.WARNING(f"  {name}: {'; '.join(problems)}"))
+
+        if regressions:
+            self.stdout.write(self.style.WARNING(f'{regressions} route(s) regressed.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No regressions.'))
+        return regressions
@@ -0,0 +1,100 @@
+"""
+Move uploaded files to content-addressed names, sharing identical files
+"""
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from main import caching, home, images
+from main.middleware import PAGE_CACHE_VERSION
+from main.storage import content_digest, content_name
+
+
+def file_fields():
+    """(model, field) for every FileField and ImageField in the project"""
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+class Command(BaseCommand):
+    help = 'Rename uploaded files to their content hash so identical uploads share one file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete-originals', action='store_true',
+                            help='Delete the old files (and their renditions) once no row refers to them')
+
+    def handle(self, *args, **options):
+        moved, shared, missing = {}, 0, 0
+        shared_bytes = 0
+        image_fields = images.image_fields()
+
+        for model, field in file_fields():
+            storage = field.storage
+            names = (
+                model._default_manager.exclude(**{field.name: ''})
+                .values_list(field.name, flat=True).distinct()
+            )
+            updated_model = False
+            for name in list(names):
+                if content_digest(name):
+                    continue
+                if name not in moved:
+                    if not storage.exists(name):
+                        self.stderr.write(self.style.WARNING(f'Missing file {name}'))
+                        missing += 1
+                        continue
+                    with storage.open(name, 'rb') as content:
+                        new_name = content_name(name, content)
+                        if storage.exists(new_name):
+                            shared += 1
+                            shared_bytes += storage.size(name)
+                        else:
+                            storage.save(new_name, content)
+                    moved[name] = new_name
+
+                model._default_manager.filter(**{field.name: name}).update(**{field.name: moved[name]})
+                updated_model = True
+
+                if image_fields.get(model) == field.name:
+                    field_file = field.attr_class(None, field, moved[name])
+                    if not images.has_renditions(field_file):
+                        try:
+                            images.generate_renditions(field_file)
+                        except images.RenditionError as e:
+                            self.stderr.write(self.style.WARNING(f'No renditions for {e}'))
+
+            if updated_model:
+                # QuerySet.update skips the signals that drop cached sections
+                home.invalidate_for_model(model)
+        caching.bump_version(PAGE_CACHE_VERSION)
+
+        deleted = 0
+        if options['delete_originals']:
+            deleted = self.delete_originals(moved)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {len(moved)} file(s): {shared} duplicate(s) now shared ({shared_bytes} bytes saved), '
+            f'{missing} missing, {deleted} old file(s) deleted.'
+        ))
+
+    def delete_originals(self, moved):
+        old_names, still_used = list(moved), set()
+        for model, field in file_fields():
+            for start in range(0, len(old_names), 500):
+                still_used.update(
+                    model._default_manager.filter(**{f'{field.name}__in': old_names[start:start + 500]})
+                    .values_list(field.name, flat=True)
+                )
+
+        deleted = 0
+        for name in moved:
+            if name in still_used:
+                continue
+            for old_name in [name] + images.rendition_names(name):
+                if default_storage.exists(old_name):
+                    default_storage.delete(old_name)
+                    deleted += 1
+        return deleted
@@ -0,0 +1,300 @@
+"""
+Generate a reproducible large-university dataset for benchmarking
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Department, Faculty, StudentProfile
+from courses.models import Course, Enrollment
+from courses.prerequisites import rebuild_closure
+from courses.services import recount_seats
+from events import calendar, related
+from events.models import Announcement, Event
+from main import caching, home, reference, statistics, suggest
+from main.middleware import PAGE_CACHE_VERSION
+from main.search import rebuild_index
+
+# Generated rows are recognisable by these prefixes so --clear only touches them
+USERNAME_PREFIX = 'gen-'
+CODE_PREFIX = 'G'
+
+WORDS = (
+    'advanced applied data systems theory principles analysis design modern '
+    'computing networks economics finance law ethics islamic studies history '
+    'literature physics chemistry biology mathematics statistics management '
+    'marketing engineering circuits signals structures software security '
+    'learning research methods seminar workshop culture sports science'
+).split()
+FIRST_NAMES = (
+    'Abdul Ayesha Farhan Fatima Hasan Nusrat Rahim Sadia Tanvir Zarin Karim '
+    'Mariam Imran Sumaiya Rafiq Jannat Arif Tasnim Kamal Lamia'
+).split()
+LAST_NAMES = (
+    'Rahman Hossain Chowdhury Islam Ahmed Khan Uddin Akter Begum Sarker '
+    'Talukder Miah Siddiqui Haque Karim'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Generate a reproducible synthetic dataset (departments, faculty, courses, events, students, enrollments)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--departments', type=int, default=2000)
+        parser.add_argument('--faculty', type=int, default=6000)
+        parser.add_argument('--courses', type=int, default=12000)
+        parser.add_argument('--events', type=int, default=5000)
+        parser.add_argument('--announcements', type=int, default=5000)
+        parser.add_argument('--students', type=int, default=200000)
+        parser.add_argument('--enrollments-per-student', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated rows first')
+
+    def handle(self, *args, **options):
+        if options['departments'] < 1 or options['faculty'] < 1 or options['courses'] < 1:
+            raise CommandError('At least one department, faculty member and course is required.')
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists() and not options['clear']:
+            raise CommandError('Generated data already exists; pass --clear to replace it.')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        # One hash for every generated account; they all log in with "password"
+        self.password = make_password('password')
+        # Dates are relative to today so events stay upcoming
+        self.today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        if options['clear']:
+            self.clear()
+
+        with transaction.atomic():
+            departments = self.create_departments(options['departments'])
+            faculty = self.create_faculty(options['faculty'], departments)
+            courses = self.create_courses(options['courses'], faculty)
+            self.create_prerequisites(courses)
+            organizers = [member[1] for member in faculty[:200]]
+            self.create_events(options['events'], departments, organizers)
+            self.create_announcements(options['announcements'], departments, organizers)
+            students = self.create_students(options['students'], departments)
+            self.create_enrollments(students, courses, options['enrollments_per_student'])
+
+        # bulk_create skips signals, so rebuild the derived data explicitly
+        self.stdout.write('Rebuilding derived data...')
+        recount_seats()
+        rebuild_closure()
+        rebuild_index()
+        related.rebuild()
+        statistics.rebuild()
+        self.invalidate_caches()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(departments)} departments, {len(faculty)} faculty, "
+            f"{len(courses)} courses and {len(students)} students."
+        ))
+
+    def clear(self):
+        self.stdout.write('Deleting previously generated data...')
+        with transaction.atomic():
+            Department.objects.filter(code__startswith=CODE_PREFIX).delete()
+            User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+    def bulk_create(self, model, objects):
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def name(self, count):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(count)).title()
+
+    def create_users(self, role, count):
+        users = [
+            User(
+                username=f"{USERNAME_PREFIX}{role}-{i}",
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                email=f"{role}{i}@example.edu",
+                password=self.password,
+            )
+            for i in range(count)
+        ]
+        self.bulk_create(User, users)
+        return list(
+            User.objects.filter(username__startswith=f"{USERNAME_PREFIX}{role}-")
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def create_departments(self, count):
+        self.stdout.write(f'Creating {count} departments...')
+        self.bulk_create(Department, [
+            Department(
+                name=f"Department of {self.name(2)} {i}",
+                code=f"{CODE_PREFIX}{i:05d}",
+                description=self.name(12),
+                established_year=self.rng.randint(1950, 2020),
+            )
+            for i in range(count)
+        ])
+        return list(
+            Department.objects.filter(code__startswith=CODE_PREFIX)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def create_faculty(self, count, departments):
+        self.stdout.write(f'Creating {count} faculty members...')
+        user_ids = self.create_users('faculty', count)
+        designations = [choice for choice, _label in Faculty.DESIGNATION_CHOICES]
+        self.bulk_create(Faculty, [
+            Faculty(
+                user_id=user_id,
+                employee_id=f"{CODE_PREFIX}F{i:06d}",
+                department_id=departments[i % len(departments)],
+                designation=self.rng.choice(designations),
+                specialization=self.name(3),
+                qualification=f"PhD in {self.name(2)}",
+                experience_years=self.rng.randint(0, 35),
+                bio=self.name(40),
+                research_interests=self.name(10),
+                is_featured=i < 6,
+            )
+            for i, user_id in enumerate(user_ids)
+        ])
+        return list(
+            Faculty.objects.filter(employee_id__startswith=f"{CODE_PREFIX}F")
+            .order_by('pk').values_list('pk', 'user_id', 'department_id')
+        )
+
+    def create_courses(self, count, faculty):
+        self.stdout.write(f'Creating {count} courses...')
+        semesters = [choice for choice, _label in Course.SEMESTER_CHOICES]
+        levels = [choice for choice, _label in Course.LEVEL_CHOICES]
+        courses = []
+        for i in range(count):
+            instructor_id, _user_id, department_id = faculty[i % len(faculty)]
+            courses.append(Course(
+                name=self.name(3),
+                code=f"{CODE_PREFIX}C{i:06d}",
+                description=self.name(50),
+                department_id=department_id,
+                instructor_id=instructor_id,
+                credits=self.rng.choice([1, 2, 3, 3, 4]),
+                semester=self.rng.choice(semesters),
+                year=self.rng.randint(2022, 2026),
+                level=self.rng.choice(levels),
+                max_students=self.rng.randint(40, 150),
+                schedule=self.rng.choice(['Sun/Tue 09:00-10:30', 'Mon/Wed 11:00-12:30', 'Thu 14:00-17:00']),
+                classroom=f"Room {self.rng.randint(100, 999)}",
+                is_featured=i < 6,
+            ))
+        self.bulk_create(Course, courses)
+        return list(
+            Course.objects.filter(code__startswith=f"{CODE_PREFIX}C")
+            .order_by('pk').values_list('pk', 'department_id', 'max_students')
+        )
+
+    def create_prerequisites(self, courses):
+        # Only earlier courses of the same department can be required, which
+        # keeps the prerequisite graph acyclic
+        Prerequisite = Course.prerequisites.through
+        by_department = {}
+        links = []
+        for course_id, department_id, _max_students in courses:
+            earlier = by_department.setdefault(department_id, [])
+            if earlier and self.rng.random() < 0.3:
+                for required_id in self.rng.sample(earlier, min(len(earlier), self.rng.randint(1, 2))):
+                    links.append(Prerequisite(from_course_id=course_id, to_course_id=required_id))
+            earlier.append(course_id)
+        self.bulk_create(Prerequisite, links)
+
+    def create_events(self, count, departments, organizers):
+        self.stdout.write(f'Creating {count} events...')
+        event_types = [choice for choice, _label in Event.EVENT_TYPES]
+        events = []
+        for i in range(count):
+            start = self.today + timedelta(days=self.rng.randint(-365, 365), hours=self.rng.randint(8, 18))
+            events.append(Event(
+                title=f"{self.name(3)} {i}",
+                description=self.name(60),
+                event_type=self.rng.choice(event_types),
+                start_date=start,
+                end_date=start + timedelta(hours=self.rng.randint(1, 72)),
+                location=f"Hall {self.rng.randint(1, 20)}",
+                organizer_id=self.rng.choice(organizers),
+                department_id=self.rng.choice(departments) if self.rng.random() < 0.7 else None,
+                max_participants=self.rng.choice([None, 50, 100, 500]),
+                registration_required=self.rng.random() < 0.4,
+                is_featured=i < 6,
+            ))
+        self.bulk_create(Event, events)
+
+    def create_announcements(self, count, departments, authors):
+        self.stdout.write(f'Creating {count} announcements...')
+        priorities = [choice for choice, _label in Announcement.PRIORITY_CHOICES]
+        announcements = []
+        for i in range(count):
+            expiry = self.today + timedelta(days=self.rng.randint(-180, 180))
+            announcements.append(Announcement(
+                title=f"{self.name(4)} {i}",
+                content=self.name(80),
+                author_id=self.rng.choice(authors),
+                department_id=self.rng.choice(departments) if self.rng.random() < 0.5 else None,
+                priority=self.rng.choice(priorities),
+                target_audience='All Students',
+                expiry_date=expiry if self.rng.random() < 0.8 else None,
+                is_pinned=self.rng.random() < 0.01,
+            ))
+        self.bulk_create(Announcement, announcements)
+
+    def create_students(self, count, departments):
+        self.stdout.write(f'Creating {count} students...')
+        user_ids = self.create_users('student', count)
+        years = [choice for choice, _label in StudentProfile.YEAR_CHOICES]
+        self.bulk_create(StudentProfile, [
+            StudentProfile(
+                user_id=user_id,
+                student_id=f"{CODE_PREFIX}S{i:07d}",
+                department_id=self.rng.choice(departments),
+                year=self.rng.choice(years),
+            )
+            for i, user_id in enumerate(user_ids)
+        ])
+        return list(
+            StudentProfile.objects.filter(student_id__startswith=f"{CODE_PREFIX}S")
+            .order_by('pk').values_list('pk', 'department_id')
+        )
+
+    def create_enrollments(self, students, courses, per_student):
+        self.stdout.write(f'Creating up to {len(students) * per_student} enrollments...')
+        by_department = {}
+        for course_id, department_id, _max_students in courses:
+            by_department.setdefault(department_id, []).append(course_id)
+        all_courses = [course_id for course_id, _department_id, _max_students in courses]
+        seats_left = {course_id: max_students for course_id, _department_id, max_students in courses}
+
+        batch = []
+        for student_id, department_id in students:
+            # Mostly courses of the student's own department
+            pool = by_department.get(department_id) or all_courses
+            chosen = set()
+            for _ in range(per_student * 2):
+                if len(chosen) >= per_student:
+                    break
+                course_id = self.rng.choice(pool if self.rng.random() < 0.8 else all_courses)
+                if course_id not in chosen and seats_left[course_id] > 0:
+                    chosen.add(course_id)
+                    seats_left[course_id] -= 1
+            batch.extend(Enrollment(student_id=student_id, course_id=course_id) for course_id in chosen)
+            if len(batch) >= self.batch_size:
+                self.bulk_create(Enrollment, batch)
+                batch = []
+        self.bulk_create(Enrollment, batch)
+
+    def invalidate_caches(self):
+        caching.bump_version(suggest.VERSION_NAME)
+        caching.bump_version(PAGE_CACHE_VERSION)
+        for model in (Department, Faculty, User, Course, Event):
+            home.invalidate_for_model(model)
+        reference.departments.invalidate()
+        calendar.invalidate_all()
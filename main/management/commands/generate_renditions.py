@@ -0,0 +1,40 @@
+"""
+Backfill image renditions for existing gallery, event and profile pictures
+"""
+from django.core.management.base import BaseCommand
+
+from main import images
+
+
+class Command(BaseCommand):
+    help = 'Generate missing resized and WebP renditions of uploaded images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate renditions that already exist')
+
+    def handle(self, *args, **options):
+        processed = skipped = failed = 0
+        for model, field_name in images.image_fields().items():
+            names = (
+                model.objects.exclude(**{field_name: ''})
+                .values_list(field_name, flat=True).distinct().iterator()
+            )
+            field = model._meta.get_field(field_name)
+            for name in names:
+                # A bare FieldFile is enough to reach the storage
+                field_file = field.attr_class(None, field, name)
+                if not options['force'] and images.has_renditions(field_file):
+                    skipped += 1
+                    continue
+                try:
+                    images.generate_renditions(field_file)
+                except images.RenditionError as e:
+                    self.stderr.write(self.style.WARNING(f'Skipped {e}'))
+                    failed += 1
+                    continue
+                processed += 1
+            self.stdout.write(f'{model._meta.verbose_name_plural}: done')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated renditions for {processed} image(s); {skipped} already done, {failed} unreadable.'
+        ))
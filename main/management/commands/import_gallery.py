@@ -0,0 +1,101 @@
+"""
+Bulk-import gallery images from a ZIP archive
+
+Decoding, validation, resizing, EXIF stripping and rendition encoding run
+in a process pool, one archive member per task (see ``main.gallery_import``);
+the parent process only writes the finished files and creates the rows with
+``bulk_create``.
+"""
+import os
+import posixpath
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+
+from main import caching, home, images
+from main.gallery_import import open_archive, process_member
+from main.middleware import PAGE_CACHE_VERSION
+from main.models import GalleryImage
+
+IMAGE_EXTENSIONS = frozenset(['.jpg', '.jpeg', '.png', '.gif', '.webp'])
+
+
+def archive_members(archive):
+    """Image members worth decoding, in archive order"""
+    for info in archive.infolist():
+        name = info.filename
+        basename = posixpath.basename(name)
+        if info.is_dir() or name.startswith('__MACOSX/') or basename.startswith('.'):
+            continue
+        if posixpath.splitext(basename)[1].lower() not in IMAGE_EXTENSIONS:
+            continue
+        yield info
+
+
+class Command(BaseCommand):
+    help = 'Import every image in a ZIP archive into the gallery using all CPU cores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archive', help='Path to a .zip file of images')
+        parser.add_argument('--description', default='', help='Description given to every imported image')
+        parser.add_argument('--featured', action='store_true', help='Mark the imported images as featured')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+        parser.add_argument('--batch-size', type=int, default=200, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        try:
+            archive = zipfile.ZipFile(options['archive'])
+        except (OSError, zipfile.BadZipFile) as e:
+            raise CommandError(f"Cannot read {options['archive']}: {e}")
+
+        members, skipped = [], 0
+        with archive:
+            for info in archive_members(archive):
+                # Uncompressed size as declared by the archive; guards against zip bombs
+                if info.file_size > settings.GALLERY_IMPORT_MAX_FILE_SIZE:
+                    self.stderr.write(self.style.WARNING(f'Skipped {info.filename}: file too large'))
+                    skipped += 1
+                    continue
+                members.append(info.filename)
+        if not members:
+            raise CommandError('The archive contains no images.')
+
+        field = GalleryImage._meta.get_field('image')
+        storage = field.storage
+        batch, imported = [], 0
+        self.stdout.write(f"Importing {len(members)} image(s) with {options['workers']} worker(s)...")
+
+        with ProcessPoolExecutor(
+            max_workers=options['workers'], initializer=open_archive, initargs=(options['archive'],)
+        ) as pool:
+            for result in pool.map(process_member, members, chunksize=4):
+                if 'error' in result:
+                    self.stderr.write(self.style.WARNING(f"Skipped {result['member']}: {result['error']}"))
+                    skipped += 1
+                    continue
+
+                name = storage.save(field.generate_filename(None, result['filename']), ContentFile(result['original']))
+                images.store_renditions(storage, name, result['renditions'])
+                batch.append(GalleryImage(
+                    title=result['title'],
+                    image=name,
+                    description=options['description'],
+                    is_featured=options['featured'],
+                ))
+                if len(batch) >= options['batch_size']:
+                    GalleryImage.objects.bulk_create(batch)
+                    imported += len(batch)
+                    batch = []
+                    self.stdout.write(f'Imported {imported} image(s)...')
+
+        GalleryImage.objects.bulk_create(batch)
+        imported += len(batch)
+
+        # bulk_create skips the signals that invalidate cached pages
+        home.invalidate_for_model(GalleryImage)
+        caching.bump_version(PAGE_CACHE_VERSION)
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {imported} image(s); skipped {skipped}.'))
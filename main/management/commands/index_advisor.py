@@ -0,0 +1,102 @@
+"""
+Replay the views' querysets through EXPLAIN QUERY PLAN and report
+full table scans and temporary sorts
+"""
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+
+from accounts.views import FacultyListView
+from courses.models import Assignment, Course, Enrollment, Material
+from courses.views import CourseListView
+from events.models import Announcement, Event
+from events.views import AnnouncementListView, EventListView
+
+
+def list_view_queryset(view_class, params):
+    """The page of rows a ListView would fetch for the given query parameters"""
+    request = RequestFactory().get('/', params)
+    request.user = AnonymousUser()
+    view = view_class()
+    view.setup(request)
+    return view.get_queryset()[:view.paginate_by]
+
+
+def replayed_querysets():
+    """(label, queryset) pairs mirroring what the views run per request"""
+    now = timezone.now()
+    course = Course.objects.values_list('pk', 'department_id').first() or (0, 0)
+    student_id = Enrollment.objects.values_list('student_id', flat=True).first() or 0
+    return [
+        ('course list', list_view_queryset(CourseListView, {})),
+        ('course list filtered', list_view_queryset(
+            CourseListView, {'level': 'undergraduate', 'semester': 'fall'}
+        )),
+        ('department courses', Course.objects.filter(department_id=course[1], is_active=True)),
+        ('course materials', Material.objects.filter(course_id=course[0], is_published=True)),
+        ('course assignments', Assignment.objects.filter(course_id=course[0], is_published=True)),
+        ('my courses', Enrollment.objects.filter(student_id=student_id, is_active=True)),
+        ('faculty list', list_view_queryset(FacultyListView, {})),
+        ('event list', list_view_queryset(EventListView, {})),
+        ('event list upcoming', list_view_queryset(EventListView, {'time': 'upcoming'})),
+        ('event list ongoing', list_view_queryset(EventListView, {'time': 'ongoing'})),
+        ('event list past', list_view_queryset(EventListView, {'time': 'past'})),
+        ('featured events', Event.objects.filter(is_featured=True, is_published=True, start_date__gt=now)[:3]),
+        ('related events', Event.objects.filter(event_type='academic', is_published=True)[:3]),
+        ('announcement list', list_view_queryset(AnnouncementListView, {})),
+        ('pinned announcements', Announcement.objects.filter(
+            Announcement.active_filter(now), is_pinned=True, is_published=True
+        )[:3]),
+    ]
+
+
+def explain(queryset):
+    """Return the detail column of each EXPLAIN QUERY PLAN row"""
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def problems_in(plan):
+    problems = []
+    for detail in plan:
+        if detail.startswith('SCAN') and 'INDEX' not in detail:
+            problems.append(f"full scan: {detail}")
+        elif 'USE TEMP B-TREE' in detail:
+            problems.append(f"temp sort: {detail}")
+    return problems
+
+
+class Command(BaseCommand):
+    help = 'Report full table scans and temporary B-tree sorts in the views\' queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only problems')
+        parser.add_argument('--sql', action='store_true', help='Print the SQL of each query')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('The index advisor reads SQLite query plans only.')
+
+        flagged = 0
+        for label, queryset in replayed_querysets():
+            plan = explain(queryset)
+            problems = problems_in(plan)
+            if not problems and not options['verbose_plans']:
+                continue
+
+            style = self.style.WARNING if problems else self.style.SUCCESS
+            self.stdout.write(style(f"{label}: {len(problems)} problem(s)"))
+            if options['sql']:
+                self.stdout.write(f"  {queryset.query}")
+            for detail in plan if options['verbose_plans'] else problems:
+                self.stdout.write(f"    {detail}")
+            flagged += bool(problems)
+
+        if flagged:
+            self.stdout.write(self.style.WARNING(f'{flagged} query(s) need attention.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No full scans or temporary sorts found.'))
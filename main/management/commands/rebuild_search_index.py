@@ -0,0 +1,14 @@
+"""
+Rebuild the site-wide search index from the database
+"""
+from django.core.management.base import BaseCommand
+
+from main.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search index for courses, faculty, events and announcements'
+
+    def handle(self, *args, **options):
+        postings = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt with {postings} postings.'))
@@ -0,0 +1,14 @@
+"""
+Recompute department and university statistics from the database
+"""
+from django.core.management.base import BaseCommand
+
+from main.statistics import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the department and university counters (active courses, faculty, students, enrollments)'
+
+    def handle(self, *args, **options):
+        departments = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Statistics rebuilt for {departments} department(s).'))
@@ -0,0 +1,160 @@
+"""
+Middleware for main app
+"""
+import hashlib
+import logging
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import get_conditional_response
+
+from . import caching
+from .queries import QueryRecorder
+from .routers import start_replica_reads, stop_replica_reads
+
+PAGE_CACHE_VERSION = 'pages'
+
+logger = logging.getLogger('main.queries')
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Full-page cache for anonymous visitors on public URLs
+
+    Only cookieless GET/HEAD requests to the URL names listed in
+    ``PAGE_CACHE_URL_NAMES`` are served from or stored in the cache, so
+    logged-in users, visitors with pending flash messages and pages that
+    rendered a CSRF token always bypass it. Keys combine the path with the
+    normalized query string and the ``pages`` version stamp, which model
+    signals bump whenever public content changes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        key = getattr(request, '_page_cache_key', None)
+        if key and self._is_storable(request, response):
+            cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self._is_cacheable_request(request):
+            return None
+
+        key = self._make_key(request)
+        response = cache.get(key)
+        if response is None:
+            request._page_cache_key = key
+            return None
+
+        response['X-Page-Cache'] = 'hit'
+        if response.has_header('ETag'):
+            not_modified = get_conditional_response(request, etag=response['ETag'])
+            if not_modified is not None:
+                return not_modified
+        return response
+
+    @staticmethod
+    def _is_cacheable_request(request):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        match = request.resolver_match
+        if match is None or match.view_name not in settings.PAGE_CACHE_URL_NAMES:
+            return False
+        # Any session (a logged-in user, flash messages) or message cookie
+        # means the page may be personalised
+        return not (
+            settings.SESSION_COOKIE_NAME in request.COOKIES
+            or CookieStorage.cookie_name in request.COOKIES
+        )
+
+    @staticmethod
+    def _is_storable(request, response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED')
+            and 'private' not in response.get('Cache-Control', '')
+            and 'no-store' not in response.get('Cache-Control', '')
+        )
+
+    @staticmethod
+    def _make_key(request):
+        # Blank filters are the same page as no filter; order is irrelevant
+        params = sorted(
+            (name, value)
+            for name, values in request.GET.lists()
+            for value in values
+            if value
+        )
+        raw = f"{request.path}?{urlencode(params)}"
+        digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+        return f"page:{caching.get_version(PAGE_CACHE_VERSION)}:{digest}"
+
+
+class QueryInspectorMiddleware:
+    """
+    Per-request SQL query counter and N+1 detector for development/staging
+
+    Enabled by ``QUERY_INSPECTOR_ENABLED``. Every response gets
+    ``X-Query-Count`` and ``X-Query-Time`` headers; when a query shape repeats
+    ``QUERY_INSPECTOR_N_PLUS_ONE_THRESHOLD`` times or more, a warning with the
+    grouped queries and the view or template lines behind them is logged.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTOR_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.QUERY_INSPECTOR_N_PLUS_ONE_THRESHOLD
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        response['X-Query-Count'] = str(recorder.count)
+        response['X-Query-Time'] = f"{recorder.total_time * 1000:.1f}ms"
+        if recorder.n_plus_one(self.threshold):
+            logger.warning(
+                "Possible N+1 queries on %s %s\n%s",
+                request.method, request.path, recorder.report(self.threshold),
+            )
+        return response
+
+
+class ReadReplicaMiddleware:
+    """
+    Serve reads for the views in ``READ_REPLICA_URL_NAMES`` from the
+    read-only database alias
+
+    Only GET/HEAD requests are routed; writes made while handling them
+    (sessions, flash messages) still go to the primary through the router.
+    Routing stays on until the response, including any template, has been
+    rendered.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            token = getattr(request, '_replica_token', None)
+            if token is not None:
+                stop_replica_reads(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.resolver_match.view_name in settings.READ_REPLICA_URL_NAMES
+        ):
+            request._replica_token = start_replica_reads()
+        return None
@@ -65,4 +65,65 @@ class UniversityInfo(models.Model):
         verbose_name_plural = "University Information"
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class SearchTerm(models.Model):
+    """Inverted index posting used by site-wide search"""
+    KIND_COURSE = 'course'
+    KIND_FACULTY = 'faculty'
+    KIND_EVENT = 'event'
+    KIND_ANNOUNCEMENT = 'announcement'
+
+    KIND_CHOICES = [
+        (KIND_COURSE, 'Course'),
+        (KIND_FACULTY, 'Faculty'),
+        (KIND_EVENT, 'Event'),
+        (KIND_ANNOUNCEMENT, 'Announcement'),
+    ]
+
+    term = models.CharField(max_length=64)
+    kind = models.CharField(max_length=15, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    weight = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'kind']),
+            models.Index(fields=['kind', 'object_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.kind}:{self.object_id}"
+
+class DepartmentStatistics(models.Model):
+    """Per-department counters, kept current by main.statistics"""
+    department = models.OneToOneField(
+        'accounts.Department',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistics'
+    )
+    active_courses = models.IntegerField(default=0)
+    faculty = models.IntegerField(default=0)
+    students = models.IntegerField(default=0)
+    enrollments = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Department statistics"
+
+    def __str__(self):
+        return f"Statistics for department {self.department_id}"
+
+class UniversityStatistics(models.Model):
+    """University-wide counters (a single row), kept current by main.statistics"""
+    departments = models.IntegerField(default=0)
+    active_courses = models.IntegerField(default=0)
+    faculty = models.IntegerField(default=0)
+    students = models.IntegerField(default=0)
+    enrollments = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "University statistics"
+
+    def __str__(self):
+        return "University statistics"
@@ -0,0 +1,200 @@
+"""
+Keyset (cursor) pagination
+
+Pages are selected with a ``WHERE`` on the ordering columns of the last row
+shown instead of ``OFFSET``, so deep pages cost the same as the first one
+and no ``COUNT(*)`` is needed. Cursors encode the ordering values of a
+boundary row, which keeps pages stable while rows are added or removed.
+
+Orderings must end in a unique column (``pk`` is appended otherwise) and
+must not contain nullable columns.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps([direction, [_encode_value(value) for value in values]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Return ``(direction, values)`` for a cursor of an ordering with ``size`` fields"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Invalid cursor')
+    return direction, values
+
+
+class CursorPage:
+    """One page of a cursor-paginated queryset"""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.has_next_page = has_next
+        self.has_previous_page = has_previous
+        self.next_querystring = ''
+        self.previous_querystring = ''
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.has_next_page
+
+    def has_previous(self):
+        return self.has_previous_page
+
+    def has_other_pages(self):
+        return self.has_next_page or self.has_previous_page
+
+    @property
+    def next_cursor(self):
+        if not self.has_next_page:
+            return None
+        return self.paginator.cursor_for(self.object_list[-1], NEXT)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous_page:
+            return None
+        return self.paginator.cursor_for(self.object_list[0], PREVIOUS)
+
+
+class CursorPaginator:
+    """Paginate a queryset by keyset on ``ordering``"""
+
+    def __init__(self, queryset, per_page, ordering):
+        ordering = list(ordering)
+        if ordering[-1].lstrip('-') not in ('pk', 'id'):
+            ordering.append('pk')
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.ordering = ordering
+
+    def cursor_for(self, obj, direction):
+        values = []
+        for field in self.ordering:
+            value = obj
+            for attr in field.lstrip('-').split('__'):
+                value = getattr(value, attr)
+            values.append(value)
+        return encode_cursor(values, direction)
+
+    def _seek(self, values, forward):
+        # (a, b, pk) > (x, y, z) expanded as
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND pk > z),
+        # with the comparison flipped for descending fields
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def page(self, cursor=None):
+        """Return the page a cursor points to; no cursor gives the first page"""
+        if not cursor:
+            rows = list(self.queryset[:self.per_page + 1])
+            return CursorPage(rows[:self.per_page], self, len(rows) > self.per_page, False)
+
+        direction, values = decode_cursor(cursor, len(self.ordering))
+        if direction == NEXT:
+            rows = list(self.queryset.filter(self._seek(values, forward=True))[:self.per_page + 1])
+            return CursorPage(rows[:self.per_page], self, len(rows) > self.per_page, True)
+
+        # Walk backwards with the ordering reversed, then restore it
+        rows = list(self.queryset.filter(self._seek(values, forward=False)).reverse()[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return CursorPage(rows, self, True, has_previous)
+
+    def get_page(self, cursor=None):
+        """Like ``page()`` but falls back to the first page for a bad cursor"""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+
+def cursor_pagination_enabled():
+    return getattr(settings, 'CURSOR_PAGINATION', False)
+
+
+def paginate_by_cursor(request, queryset, per_page, ordering, param='cursor', strict=False):
+    """Return the requested page with next/previous query strings filled in"""
+    paginator = CursorPaginator(queryset, per_page, ordering)
+    cursor = request.GET.get(param)
+    page = paginator.page(cursor) if strict else paginator.get_page(cursor)
+
+    for attr, value in (('next_querystring', page.next_cursor), ('previous_querystring', page.previous_cursor)):
+        if value is not None:
+            params = request.GET.copy()
+            params[param] = value
+            params.pop('page', None)
+            setattr(page, attr, params.urlencode())
+    return page
+
+
+class CursorPaginationMixin:
+    """
+    ListView mixin switching to keyset pagination when
+    ``settings.CURSOR_PAGINATION`` is on
+
+    Views set ``cursor_ordering``; templates render the controls with
+    ``{% include 'includes/cursor_pagination.html' with page=page_obj %}``.
+    """
+    cursor_ordering = None
+    cursor_param = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        if not cursor_pagination_enabled():
+            return super().paginate_queryset(queryset, page_size)
+        try:
+            page = paginate_by_cursor(
+                self.request, queryset, page_size, self.cursor_ordering,
+                param=self.cursor_param, strict=True,
+            )
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return page.paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_pagination'] = cursor_pagination_enabled()
+        return context
@@ -0,0 +1,129 @@
+"""
+SQL query recording and N+1 detection
+
+``QueryRecorder`` hooks into the database connection while active and keeps
+every query with the project code (view line or template line) that caused
+it. Queries are grouped by shape, i.e. SQL with parameters and ``IN`` lists
+collapsed, so a query repeated once per row of a loop shows up as one group.
+"""
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+_IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def query_shape(sql):
+    """Return ``sql`` with literals and ``IN`` lists replaced by placeholders"""
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _LITERAL_RE.sub('?', sql)
+
+
+def _project_root():
+    return str(Path(settings.BASE_DIR).resolve())
+
+
+def find_origin(frame):
+    """Return a ``path:line`` label for the code that issued a query
+
+    The innermost template node being rendered wins, since a template loop
+    is the usual N+1 culprit; otherwise the innermost frame in project code.
+    """
+    root = _project_root()
+    code_origin = None
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                return f"{origin.template_name}:{token.lineno}"
+        filename = code.co_filename
+        if (
+            code_origin is None
+            and filename.startswith(root)
+            and 'site-packages' not in filename
+            and filename != __file__
+        ):
+            code_origin = f"{Path(filename).relative_to(root)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return code_origin or 'unknown'
+
+
+class QueryRecorder:
+    """Context manager that records every query run on the given databases"""
+
+    def __init__(self, using=None):
+        self.aliases = [using] if using else list(connections)
+        self.queries = []
+        self._wrappers = []
+
+    def __enter__(self):
+        for alias in self.aliases:
+            wrapper = connections[alias].execute_wrapper(self._record)
+            wrapper.__enter__()
+            self._wrappers.append(wrapper)
+        return self
+
+    def __exit__(self, *exc_info):
+        while self._wrappers:
+            self._wrappers.pop().__exit__(*exc_info)
+
+    def _record(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'shape': query_shape(sql),
+                'time': time.perf_counter() - start,
+                'origin': find_origin(sys._getframe(1)),
+            })
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(query['time'] for query in self.queries)
+
+    def groups(self):
+        """Return query groups by shape, most repeated first"""
+        grouped = defaultdict(list)
+        for query in self.queries:
+            grouped[query['shape']].append(query)
+        groups = [
+            {
+                'shape': shape,
+                'count': len(queries),
+                'time': sum(query['time'] for query in queries),
+                'origins': sorted({query['origin'] for query in queries}),
+            }
+            for shape, queries in grouped.items()
+        ]
+        return sorted(groups, key=lambda group: group['count'], reverse=True)
+
+    def n_plus_one(self, threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        """Return the groups repeated at least ``threshold`` times"""
+        return [group for group in self.groups() if group['count'] >= threshold]
+
+    def report(self, threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        """Return a readable summary of the recorded queries"""
+        lines = [f"{self.count} queries in {self.total_time * 1000:.1f} ms"]
+        for group in self.groups():
+            marker = 'N+1 ' if group['count'] >= threshold else ''
+            lines.append(f"  {marker}{group['count']}x {group['shape'][:200]}")
+            for origin in group['origins']:
+                lines.append(f"      at {origin}")
+        return '\n'.join(lines)
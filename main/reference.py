@@ -0,0 +1,56 @@
+"""
+Process-local cache for small, rarely edited reference data
+
+Department rows and the UniversityInfo record are shown on almost every
+page. Each worker keeps its own copy in memory and only reloads it when the
+shared version stamp says an admin edited the data.
+"""
+import threading
+
+from . import caching
+
+
+class ReferenceData:
+    """In-memory copy of one reference dataset, reloaded when its stamp changes"""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._value = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = caching.get_version(self.name)
+        if self._version != version:
+            with self._lock:
+                if self._version != version:
+                    self._value = self._loader()
+                    self._version = version
+        return self._value
+
+    def version(self):
+        """Current stamp, for callers that derive validators from this data"""
+        return caching.get_version(self.name)
+
+    def invalidate(self):
+        caching.bump_version(self.name)
+
+
+def _load_departments():
+    from accounts.models import Department
+    return list(Department.objects.all())
+
+
+def _load_university_info():
+    from .models import UniversityInfo
+    return UniversityInfo.objects.first()
+
+
+departments = ReferenceData('reference:departments', _load_departments)
+university_info = ReferenceData('reference:university_info', _load_university_info)
+
+
+def department_choices(empty_label='---------'):
+    """Choices for a department select built from the cached rows"""
+    return [('', empty_label)] + [(department.pk, str(department)) for department in departments.get()]
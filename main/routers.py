@@ -0,0 +1,54 @@
+"""
+Database routing between the primary and the read-only replica alias
+
+Reads go to ``replica`` only while a request to one of the
+``READ_REPLICA_URL_NAMES`` views is being handled (see
+``main.middleware.ReadReplicaMiddleware``); everything else, and every
+write, uses ``default``.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def start_replica_reads():
+    """Route reads to the replica until ``stop_replica_reads(token)``"""
+    return _use_replica.set(True)
+
+
+def stop_replica_reads(token):
+    _use_replica.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    """Send ORM reads made inside the block to the replica"""
+    token = start_replica_reads()
+    try:
+        yield
+    finally:
+        stop_replica_reads(token)
+
+
+class ReadReplicaRouter:
+    """Route reads to the replica inside ``replica_reads()``, writes to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and REPLICA_ALIAS in settings.DATABASES:
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
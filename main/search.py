@@ -0,0 +1,261 @@
+"""
+Site-wide search index for courses, faculty, events and announcements
+
+Searchable text is tokenized once when a record is saved and stored as
+weighted postings in ``SearchTerm``. Queries then become indexed range
+lookups on ``term`` instead of ``LIKE '%...%'`` scans over every text column.
+Ranked results are cached per normalized query until the index changes.
+"""
+import hashlib
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, Q, Sum, When
+
+from . import caching
+from .models import SearchTerm
+
+VERSION_NAME = 'search'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TERM_LENGTH = 64
+MIN_PREFIX_LENGTH = 2
+
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'is', 'it', 'of', 'on', 'or', 'the', 'to', 'with',
+])
+
+# Relative importance of each field; titles outrank body text
+FIELD_WEIGHTS = {
+    'code': 4.0,
+    'title': 3.0,
+    'name': 3.0,
+    'specialization': 2.0,
+    'department': 1.5,
+    'body': 1.0,
+}
+
+
+def tokenize(text):
+    """Split text into lowercase search terms"""
+    if not text:
+        return []
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(text.lower())
+        if token not in STOP_WORDS
+    ]
+
+
+def _course_fields(course):
+    return {
+        'code': course.code,
+        'name': course.name,
+        'department': course.department.name,
+        'body': course.description,
+    }
+
+
+def _faculty_fields(faculty):
+    return {
+        'name': faculty.user.get_full_name(),
+        'specialization': faculty.specialization,
+        'department': faculty.department.name,
+    }
+
+
+def _event_fields(event):
+    return {
+        'title': event.title,
+        'body': event.description,
+    }
+
+
+def _announcement_fields(announcement):
+    return {
+        'title': announcement.title,
+        'body': announcement.content,
+    }
+
+
+def _get_registry():
+    from accounts.models import Faculty
+    from courses.models import Course
+    from events.models import Announcement, Event
+
+    return {
+        SearchTerm.KIND_COURSE: (
+            Course, _course_fields,
+            lambda qs: qs.select_related('department', 'instructor__user'),
+            lambda obj: True,
+        ),
+        SearchTerm.KIND_FACULTY: (
+            Faculty, _faculty_fields,
+            lambda qs: qs.select_related('user', 'department'),
+            lambda obj: True,
+        ),
+        SearchTerm.KIND_EVENT: (
+            Event, _event_fields,
+            lambda qs: qs.select_related('department'),
+            lambda obj: obj.is_published,
+        ),
+        SearchTerm.KIND_ANNOUNCEMENT: (
+            Announcement, _announcement_fields,
+            lambda qs: qs,
+            lambda obj: obj.is_published,
+        ),
+    }
+
+
+def kind_for_model(model):
+    """Return the index kind for a model class, or None if it is not indexed"""
+    for kind, (indexed_model, *_rest) in _get_registry().items():
+        if issubclass(model, indexed_model):
+            return kind
+    return None
+
+
+def build_postings(kind, instance):
+    """Compute the weighted postings for one record"""
+    fields = _get_registry()[kind][1](instance)
+    weights = Counter()
+    for field, text in fields.items():
+        for term, count in Counter(tokenize(text)).items():
+            # Dampen repeated terms so long descriptions don't dominate
+            weights[term] += FIELD_WEIGHTS[field] * (1 + math.log(count))
+    return [
+        SearchTerm(term=term, kind=kind, object_id=instance.pk, weight=weight)
+        for term, weight in weights.items()
+    ]
+
+
+def index_instance(instance):
+    """Insert or refresh the postings for a single record"""
+    kind = kind_for_model(type(instance))
+    if kind is None:
+        return
+    is_searchable = _get_registry()[kind][3]
+
+    with transaction.atomic():
+        SearchTerm.objects.filter(kind=kind, object_id=instance.pk).delete()
+        if is_searchable(instance):
+            SearchTerm.objects.bulk_create(build_postings(kind, instance))
+    caching.bump_version(VERSION_NAME)
+
+
+def remove_instance(instance):
+    """Drop a record from the index"""
+    kind = kind_for_model(type(instance))
+    if kind is not None:
+        SearchTerm.objects.filter(kind=kind, object_id=instance.pk).delete()
+        caching.bump_version(VERSION_NAME)
+
+
+def reindex_queryset(kind, queryset):
+    """Refresh the postings for every record in a queryset"""
+    _model, _fields, prepare, is_searchable = _get_registry()[kind]
+    with transaction.atomic():
+        SearchTerm.objects.filter(
+            kind=kind, object_id__in=queryset.values('pk')
+        ).delete()
+        postings = []
+        for instance in prepare(queryset).iterator(chunk_size=500):
+            if is_searchable(instance):
+                postings.extend(build_postings(kind, instance))
+        SearchTerm.objects.bulk_create(postings, batch_size=1000)
+    caching.bump_version(VERSION_NAME)
+
+
+def rebuild_index():
+    """Rebuild the whole index from scratch and return the posting count"""
+    with transaction.atomic():
+        SearchTerm.objects.all().delete()
+        for kind, (model, *_rest) in _get_registry().items():
+            reindex_queryset(kind, model.objects.all())
+    return SearchTerm.objects.count()
+
+
+def _term_filter(token):
+    # A range on the indexed column matches every term starting with the
+    # token; short tokens are matched exactly to keep postings lists small
+    if len(token) < MIN_PREFIX_LENGTH:
+        return Q(term=token)
+    return Q(term__gte=token, term__lt=token + '\uffff')
+
+
+def search(query, kinds=None):
+    """
+    Return ranked object ids per kind for a free-text query
+
+    Every query term must match (as a word prefix) for a record to be
+    returned. Results are ordered by summed posting weight.
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    kinds = kinds or list(_get_registry())
+    results = {kind: [] for kind in kinds}
+    if not tokens:
+        return results
+
+    matches = {
+        f'match_{i}': Max(Case(
+            When(_term_filter(token), then=1),
+            default=0,
+            output_field=IntegerField(),
+        ))
+        for i, token in enumerate(tokens)
+    }
+    any_term = Q()
+    for token in tokens:
+        any_term |= _term_filter(token)
+
+    rows = (
+        SearchTerm.objects.filter(any_term, kind__in=kinds)
+        .values('kind', 'object_id')
+        .annotate(score=Sum('weight'), **matches)
+        .filter(**{name: 1 for name in matches})
+        .order_by('-score', 'object_id')
+    )
+    for row in rows:
+        results[row['kind']].append(row['object_id'])
+    return results
+
+
+def normalize_query(query):
+    """Reduce a query to its distinct terms so equivalent queries share results"""
+    return ' '.join(sorted(set(tokenize(query))))
+
+
+def cached_search(query, page_size):
+    """
+    Return ``(normalized_query, results)`` where ``results`` maps each kind
+    to its ranked ids and the records on its first page
+
+    Results are cached per normalized query until the index changes, so a
+    repeated query costs a cache hit instead of a database round trip.
+    """
+    normalized = normalize_query(query)
+    if not normalized:
+        return normalized, {kind: ([], []) for kind in _get_registry()}
+
+    digest = hashlib.md5(f'{normalized}:{page_size}'.encode('utf-8')).hexdigest()
+    key = f'search:{caching.get_version(VERSION_NAME)}:{digest}'
+    results = cache.get(key)
+    if results is None:
+        results = {
+            kind: (ids, fetch_ranked(kind, ids[:page_size]))
+            for kind, ids in search(normalized).items()
+        }
+        cache.set(key, results, settings.SEARCH_CACHE_TIMEOUT)
+    return normalized, results
+
+
+def fetch_ranked(kind, ids):
+    """Load the records for ranked ids, preserving rank order"""
+    model, _fields, prepare, _is_searchable = _get_registry()[kind]
+    objects = prepare(model.objects.filter(pk__in=ids)).in_bulk()
+    return [objects[pk] for pk in ids if pk in objects]
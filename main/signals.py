@@ -0,0 +1,192 @@
+"""
+Signal handlers for main app
+"""
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Department, Faculty, StudentProfile
+from courses.models import Assignment, Course, Enrollment, Material
+from events.models import Announcement, Event
+
+from . import caching, db, home, images, reference, search, statistics, suggest
+from .middleware import PAGE_CACHE_VERSION
+from .models import GalleryImage, GalleryVideo, SearchTerm, UniversityInfo
+
+SEARCHABLE_MODELS = (Course, Faculty, Event, Announcement)
+SUGGESTION_MODELS = (Course, Faculty, Event)
+
+
+# Database connections
+@receiver(connection_created)
+def configure_database_connection(sender, connection, **kwargs):
+    db.configure_sqlite(connection)
+
+
+# Search index maintenance
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_instance(instance)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+
+for model in SEARCHABLE_MODELS:
+    post_save.connect(update_search_index, sender=model, dispatch_uid=f'search_index_{model.__name__}')
+    post_delete.connect(remove_from_search_index, sender=model, dispatch_uid=f'search_remove_{model.__name__}')
+
+
+# Typeahead suggestions
+def update_suggestions(sender, instance, raw=False, **kwargs):
+    if not raw:
+        suggest.index.update(instance)
+
+
+def remove_from_suggestions(sender, instance, **kwargs):
+    suggest.index.remove(instance)
+
+
+for model in SUGGESTION_MODELS:
+    post_save.connect(update_suggestions, sender=model, dispatch_uid=f'suggest_update_{model.__name__}')
+    post_delete.connect(remove_from_suggestions, sender=model, dispatch_uid=f'suggest_remove_{model.__name__}')
+
+
+# Home page section cache
+def invalidate_home_sections(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no section shows
+    if update_fields == frozenset(['last_login']):
+        return
+    home.invalidate_for_model(sender)
+
+
+for model in (Faculty, User, Department, Event, Course, GalleryImage):
+    post_save.connect(invalidate_home_sections, sender=model, dispatch_uid=f'home_save_{model.__name__}')
+    post_delete.connect(invalidate_home_sections, sender=model, dispatch_uid=f'home_delete_{model.__name__}')
+
+
+# Anonymous full-page cache
+PUBLIC_CONTENT_MODELS = (
+    UniversityInfo, GalleryImage, GalleryVideo, Department, Faculty, User,
+    Course, Material, Assignment, Event, Announcement,
+)
+
+
+def invalidate_public_pages(sender, raw=False, update_fields=None, **kwargs):
+    if update_fields == frozenset(['last_login']):
+        return
+    caching.bump_version(PAGE_CACHE_VERSION)
+
+
+for model in PUBLIC_CONTENT_MODELS:
+    post_save.connect(invalidate_public_pages, sender=model, dispatch_uid=f'pages_save_{model.__name__}')
+    post_delete.connect(invalidate_public_pages, sender=model, dispatch_uid=f'pages_delete_{model.__name__}')
+
+
+# Image renditions
+IMAGE_MODELS = (GalleryImage, Event, Faculty, StudentProfile)
+
+
+def remember_new_upload(sender, instance, raw=False, **kwargs):
+    # A newly assigned file is saved to storage after pre_save, so it is
+    # still uncommitted here
+    field_file = getattr(instance, images.image_field_for_model(sender))
+    instance._renditions_pending = bool(field_file) and not field_file._committed and not raw
+
+
+def create_renditions(sender, instance, raw=False, **kwargs):
+    if not getattr(instance, '_renditions_pending', False):
+        return
+    instance._renditions_pending = False
+    try:
+        images.generate_renditions(getattr(instance, images.image_field_for_model(sender)))
+    except images.RenditionError:
+        # The form already validated the upload; an unreadable file keeps
+        # being served as the original
+        pass
+
+
+for model in IMAGE_MODELS:
+    pre_save.connect(remember_new_upload, sender=model, dispatch_uid=f'renditions_pre_save_{model.__name__}')
+    post_save.connect(create_renditions, sender=model, dispatch_uid=f'renditions_save_{model.__name__}')
+
+
+# Department and university statistics
+STATISTICS_MODELS = (Course, Faculty, StudentProfile, Enrollment)
+
+
+def remember_counted_state(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._statistics_before = (
+        statistics.counted_state(sender, instance.pk) if instance.pk else None
+    )
+
+
+def update_statistics(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_statistics_before', None)
+    after = statistics.counted_state(sender, instance.pk)
+    statistics.record_change(sender, before, after)
+    if sender is Course and before and after and before[0] != after[0]:
+        statistics.move_enrollments(instance.pk, before[0], after[0])
+
+
+def remove_from_statistics(sender, instance, **kwargs):
+    statistics.record_change(sender, getattr(instance, '_statistics_before', None), None)
+
+
+for model in STATISTICS_MODELS:
+    pre_save.connect(remember_counted_state, sender=model, dispatch_uid=f'stats_pre_save_{model.__name__}')
+    post_save.connect(update_statistics, sender=model, dispatch_uid=f'stats_save_{model.__name__}')
+    pre_delete.connect(remember_counted_state, sender=model, dispatch_uid=f'stats_pre_delete_{model.__name__}')
+    post_delete.connect(remove_from_statistics, sender=model, dispatch_uid=f'stats_delete_{model.__name__}')
+
+
+@receiver(post_save, sender=Department)
+def create_department_statistics(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        statistics.rebuild_department(instance.pk)
+        statistics.adjust_departments(1)
+
+
+@receiver(post_delete, sender=Department)
+def remove_department_statistics(sender, instance, **kwargs):
+    statistics.adjust_departments(-1)
+
+
+# Reference data
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_departments(sender, **kwargs):
+    reference.departments.invalidate()
+
+
+@receiver(post_save, sender=UniversityInfo)
+@receiver(post_delete, sender=UniversityInfo)
+def invalidate_university_info(sender, **kwargs):
+    reference.university_info.invalidate()
+
+
+@receiver(post_save, sender=Department)
+def reindex_department_members(sender, instance, created, raw=False, **kwargs):
+    # Courses and faculty are searchable by their department name
+    if raw or created:
+        return
+    search.reindex_queryset(SearchTerm.KIND_COURSE, Course.objects.filter(department=instance))
+    search.reindex_queryset(SearchTerm.KIND_FACULTY, Faculty.objects.filter(department=instance))
+
+
+@receiver(post_save, sender=User)
+def reindex_faculty_user(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Faculty are searchable by the names stored on their user account;
+    # logins only touch last_login and can be skipped
+    if raw or created or update_fields == frozenset(['last_login']):
+        return
+    faculty = Faculty.objects.filter(user=instance).first()
+    if faculty is not None:
+        search.reindex_queryset(SearchTerm.KIND_FACULTY, Faculty.objects.filter(pk=faculty.pk))
+        suggest.index.update(faculty)
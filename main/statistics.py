@@ -0,0 +1,175 @@
+"""
+Department and university counters maintained by deltas
+
+Signal handlers read a row's counted state (department and whether it is
+active) before and after each save or delete and apply the difference with
+``F()`` updates, so pages read the totals instead of aggregating. Code that
+bypasses signals (``QuerySet.update``, ``bulk_create``) calls
+``adjust_enrollments`` itself; ``rebuild`` recomputes everything.
+
+The university row is cached for the home and about pages and dropped
+whenever its counters change.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+
+from . import caching
+from .models import DepartmentStatistics, UniversityStatistics
+
+UNIVERSITY_PK = 1
+UNIVERSITY_CACHE_KEY = 'statistics:university'
+
+
+def _get_specs():
+    from accounts.models import Faculty, StudentProfile
+    from courses.models import Course, Enrollment
+
+    # model -> (department lookup, "counts only if" flag or None, counter)
+    return {
+        Course: ('department_id', 'is_active', 'active_courses'),
+        Faculty: ('department_id', None, 'faculty'),
+        StudentProfile: ('department_id', 'is_active', 'students'),
+        Enrollment: ('course__department_id', 'is_active', 'enrollments'),
+    }
+
+
+def counted_state(model, pk):
+    """Return ``(department_id, counted)`` for a stored row, or None"""
+    department_lookup, flag, _counter = _get_specs()[model]
+    fields = [department_lookup] + ([flag] if flag else [])
+    row = model._default_manager.filter(pk=pk).values(*fields).first()
+    if row is None:
+        return None
+    return row[department_lookup], bool(row[flag]) if flag else True
+
+
+def _apply(department_deltas, university_deltas):
+    for department_id, deltas in department_deltas.items():
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas or department_id is None:
+            continue
+        # No row means the department is being deleted or the counters were
+        # never built (see the rebuild_statistics command)
+        DepartmentStatistics.objects.filter(pk=department_id).update(
+            **{name: F(name) + value for name, value in deltas.items()}
+        )
+
+    deltas = {name: value for name, value in university_deltas.items() if value}
+    if deltas:
+        updated = UniversityStatistics.objects.filter(pk=UNIVERSITY_PK).update(
+            **{name: F(name) + value for name, value in deltas.items()}
+        )
+        if not updated:
+            rebuild_university()
+        else:
+            _invalidate_university()
+
+
+def record_change(model, before, after):
+    """Apply the difference between two ``counted_state`` results of one row"""
+    counter = _get_specs()[model][2]
+    department_deltas = defaultdict(Counter)
+    university_deltas = Counter()
+    if before is not None and before[1]:
+        department_deltas[before[0]][counter] -= 1
+        university_deltas[counter] -= 1
+    if after is not None and after[1]:
+        department_deltas[after[0]][counter] += 1
+        university_deltas[counter] += 1
+    _apply(department_deltas, university_deltas)
+
+
+def move_enrollments(course_id, old_department_id, new_department_id):
+    """Move a course's active enrollments after it changed department"""
+    from courses.models import Enrollment
+
+    moved = Enrollment.objects.filter(course_id=course_id, is_active=True).count()
+    if moved:
+        _apply({
+            old_department_id: {'enrollments': -moved},
+            new_department_id: {'enrollments': moved},
+        }, {})
+
+
+def adjust_enrollments(department_id, delta):
+    """Record ``delta`` active enrollments changed without model signals"""
+    _apply({department_id: {'enrollments': delta}}, {'enrollments': delta})
+
+
+def adjust_departments(delta):
+    _apply({}, {'departments': delta})
+
+
+def _department_counts():
+    counts = defaultdict(Counter)
+    for model, (department_lookup, flag, counter) in _get_specs().items():
+        queryset = model._default_manager.all()
+        if flag:
+            queryset = queryset.filter(**{flag: True})
+        rows = queryset.values(department_lookup).annotate(total=Count('pk')).order_by()
+        for row in rows:
+            counts[row[department_lookup]][counter] = row['total']
+    return counts
+
+
+def rebuild_department(department_id):
+    """Recompute one department's counters from the database"""
+    from accounts.models import Department
+
+    if not Department.objects.filter(pk=department_id).exists():
+        return
+    values = {}
+    for model, (department_lookup, flag, counter) in _get_specs().items():
+        queryset = model._default_manager.filter(**{department_lookup: department_id})
+        if flag:
+            queryset = queryset.filter(**{flag: True})
+        values[counter] = queryset.count()
+    DepartmentStatistics.objects.update_or_create(department_id=department_id, defaults=values)
+
+
+def rebuild_university():
+    from accounts.models import Department
+
+    values = {'departments': Department.objects.count()}
+    for model, (_department_lookup, flag, counter) in _get_specs().items():
+        queryset = model._default_manager.all()
+        if flag:
+            queryset = queryset.filter(**{flag: True})
+        values[counter] = queryset.count()
+    UniversityStatistics.objects.update_or_create(pk=UNIVERSITY_PK, defaults=values)
+    _invalidate_university()
+
+
+def rebuild():
+    """Recompute every counter from scratch and return the department count"""
+    from accounts.models import Department
+
+    with transaction.atomic():
+        counts = _department_counts()
+        department_ids = list(Department.objects.values_list('pk', flat=True))
+        DepartmentStatistics.objects.all().delete()
+        DepartmentStatistics.objects.bulk_create([
+            DepartmentStatistics(department_id=department_id, **counts.get(department_id, {}))
+            for department_id in department_ids
+        ], batch_size=1000)
+        rebuild_university()
+    return len(department_ids)
+
+
+def _invalidate_university():
+    # Readers inside the transaction still see the old row, so drop the
+    # cached copy only once the change is visible to everyone
+    transaction.on_commit(lambda: cache.delete(UNIVERSITY_CACHE_KEY))
+
+
+def university():
+    """The university-wide counters, or None before the first rebuild"""
+    return caching.get_or_build(
+        UNIVERSITY_CACHE_KEY,
+        lambda: UniversityStatistics.objects.filter(pk=UNIVERSITY_PK).first(),
+        settings.HOME_CACHE_TIMEOUT,
+    )
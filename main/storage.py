@@ -0,0 +1,59 @@
+"""
+Content-addressed media storage
+
+Uploads are stored once under the SHA-256 of their bytes
+(``content/ab/abcdef....jpg``) whatever ``upload_to`` says, so the same
+poster uploaded to events, the gallery and announcements takes one file,
+and a URL never changes meaning: it can be cached as immutable (see
+``main.views.MediaView``).
+
+Names that already start with a content hash pass through unchanged; this
+is how image renditions (``content/ab/abcdef...-320w.webp``, see
+``main.images``) are stored next to their original. Renditions are
+rewritten when the configured widths or quality change, so only exact
+``<hash>.<ext>`` names count as content-addressed. Because rows share
+files, files must never be deleted along with a row.
+"""
+import hashlib
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+CONTENT_PREFIX = 'content'
+CONTENT_PREFIX_RE = re.compile(rf'^{CONTENT_PREFIX}/([0-9a-f]{{2}})/(\1[0-9a-f]{{62}})')
+CONTENT_NAME_RE = re.compile(CONTENT_PREFIX_RE.pattern + r'(\.[^/.]*)?$')
+
+
+def content_digest(name):
+    """The content hash of a content-addressed name (``<hash>.<ext>``), or None"""
+    match = CONTENT_NAME_RE.match(name)
+    return match.group(2) if match else None
+
+
+def content_name(name, content):
+    """Content-addressed name for ``content``, keeping the extension of ``name``"""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    hexdigest = digest.hexdigest()
+    extension = posixpath.splitext(name)[1].lower()
+    return f"{CONTENT_PREFIX}/{hexdigest[:2]}/{hexdigest}{extension}"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that names files by content hash and stores each content once"""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        # Renditions are named after their original's hash
+        if not CONTENT_PREFIX_RE.match(name):
+            name = content_name(name, content)
+            # Identical bytes are already stored under this name
+            if self.exists(name):
+                return name
+        return super().save(name, content, max_length=max_length)
@@ -0,0 +1,193 @@
+"""
+In-memory prefix index for search-as-you-type suggestions
+
+Every suggestion is stored under the normalized form of its full label and
+of each word in it, in one sorted list of keys. A prefix lookup is then two
+binary searches, so a keystroke never has to touch the database.
+"""
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from . import caching
+
+VERSION_NAME = 'suggest'
+MAX_SUGGESTIONS = 8
+
+
+def normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def _course_entry(course):
+    return {
+        'kind': 'course',
+        'label': f"{course.code} - {course.name}",
+        'url': course.get_absolute_url(),
+        'terms': [course.code, course.name],
+    }
+
+
+def _faculty_entry(faculty):
+    name = faculty.user.get_full_name() or faculty.user.username
+    return {
+        'kind': 'faculty',
+        'label': name,
+        'url': faculty.get_absolute_url(),
+        'terms': [name],
+    }
+
+
+def _event_entry(event):
+    if not event.is_published:
+        return None
+    return {
+        'kind': 'event',
+        'label': event.title,
+        'url': event.get_absolute_url(),
+        'terms': [event.title],
+    }
+
+
+def _get_sources():
+    from accounts.models import Faculty
+    from courses.models import Course
+    from events.models import Event
+
+    return {
+        'course': (Course, _course_entry, Course.objects.only('pk', 'code', 'name')),
+        'faculty': (Faculty, _faculty_entry, Faculty.objects.select_related('user').only(
+            'pk', 'user', 'user__username', 'user__first_name', 'user__last_name'
+        )),
+        'event': (Event, _event_entry, Event.objects.filter(is_published=True).only(
+            'pk', 'title', 'is_published'
+        )),
+    }
+
+
+class PrefixIndex:
+    """Sorted-key prefix index over suggestion entries"""
+
+    def __init__(self):
+        self._keys = []       # sorted list of (key, entry_id)
+        self._entries = {}    # entry_id -> (kind, label, url, keys)
+        self._lock = threading.RLock()
+        self._version = None
+
+    @staticmethod
+    def _keys_for(terms):
+        keys = set()
+        for term in terms:
+            phrase = normalize(term)
+            if not phrase:
+                continue
+            keys.add(phrase)
+            words = phrase.split(' ')
+            # Index every word suffix of the phrase so "struct" finds
+            # "Data Structures"
+            for i in range(1, len(words)):
+                keys.add(' '.join(words[i:]))
+        return keys
+
+    def _add(self, entry_id, entry, keep_sorted=True):
+        keys = self._keys_for(entry['terms'])
+        self._entries[entry_id] = (entry['kind'], entry['label'], entry['url'], keys)
+        for key in keys:
+            if keep_sorted:
+                insort(self._keys, (key, entry_id))
+            else:
+                self._keys.append((key, entry_id))
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in entry[3]:
+            i = bisect_left(self._keys, (key, entry_id))
+            if i < len(self._keys) and self._keys[i] == (key, entry_id):
+                del self._keys[i]
+
+    def rebuild(self):
+        """Load every suggestion from the database"""
+        with self._lock:
+            version = caching.get_version(VERSION_NAME)
+            keys, entries = self._keys, self._entries
+            self._keys, self._entries = [], {}
+            try:
+                for kind, (_model, make_entry, queryset) in _get_sources().items():
+                    for obj in queryset.iterator(chunk_size=1000):
+                        entry = make_entry(obj)
+                        if entry:
+                            self._add((kind, obj.pk), entry, keep_sorted=False)
+                self._keys.sort()
+            except Exception:
+                self._keys, self._entries = keys, entries
+                raise
+            self._version = version
+
+    def _ensure_current(self):
+        # Another process may have changed the data since we last loaded it
+        if self._version != caching.get_version(VERSION_NAME):
+            self.rebuild()
+
+    def _advance_version(self):
+        # Bump the shared stamp; we can only patch our copy in place if no
+        # other process changed the data since we loaded it
+        loaded = self._version
+        self._version = caching.bump_version(VERSION_NAME)
+        if loaded is None or self._version != loaded + 1:
+            self._version = None
+            return False
+        return True
+
+    def update(self, instance):
+        """Add, refresh or drop the suggestion for one saved record"""
+        kind = kind_for_model(type(instance))
+        if kind is None:
+            return
+        make_entry = _get_sources()[kind][1]
+        with self._lock:
+            if not self._advance_version():
+                return
+            self._remove((kind, instance.pk))
+            entry = make_entry(instance)
+            if entry:
+                self._add((kind, instance.pk), entry)
+
+    def remove(self, instance):
+        """Drop the suggestion for a deleted record"""
+        kind = kind_for_model(type(instance))
+        if kind is None:
+            return
+        with self._lock:
+            if self._advance_version():
+                self._remove((kind, instance.pk))
+
+    def lookup(self, prefix, limit=MAX_SUGGESTIONS):
+        """Return up to ``limit`` suggestions whose label has a word starting with ``prefix``"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            self._ensure_current()
+            start = bisect_left(self._keys, (prefix,))
+            end = bisect_right(self._keys, (prefix + '\uffff',))
+            results, seen = [], set()
+            for key, entry_id in self._keys[start:end]:
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                kind, label, url, _keys = self._entries[entry_id]
+                results.append({'kind': kind, 'label': label, 'url': url})
+                if len(results) >= limit:
+                    break
+            return results
+
+
+def kind_for_model(model):
+    for kind, (source_model, *_rest) in _get_sources().items():
+        if issubclass(model, source_model):
+            return kind
+    return None
+
+
+index = PrefixIndex()
@@ -0,0 +1,43 @@
+"""
+Template tags for responsive images
+"""
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from main import images
+
+register = template.Library()
+
+
+def _srcset(field_file, webp):
+    return ', '.join(
+        f"{field_file.storage.url(images.rendition_name(field_file.name, width, webp))} {width}w"
+        for width in images.widths()
+    )
+
+
+@register.simple_tag
+def responsive_image(field_file, sizes='100vw', alt='', **attrs):
+    """
+    Render an uploaded image as a <picture> with WebP and fallback srcsets
+
+    Usage: {% responsive_image event.image sizes="(min-width: 992px) 33vw, 100vw" alt=event.title class="card-img-top" %}
+    Images without renditions yet are rendered from the original.
+    """
+    if not field_file:
+        return ''
+    attrs.setdefault('loading', 'lazy')
+    extra = format_html_join('', ' {}="{}"', attrs.items())
+
+    # One storage lookup per image; pages using this tag are cached
+    if not images.has_renditions(field_file):
+        return format_html('<img src="{}" alt="{}"{}>', field_file.url, alt, extra)
+
+    largest = images.widths()[-1]
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}"{}></picture>',
+        _srcset(field_file, webp=True), sizes,
+        field_file.storage.url(images.rendition_name(field_file.name, largest)),
+        _srcset(field_file, webp=False), sizes, alt, extra,
+    )
@@ -0,0 +1,35 @@
+"""
+Test helpers
+
+``QueryBudgetMixin`` lets a test case cap the number of SQL queries a page
+may run, reporting the grouped queries (and the lines behind them) when a
+page goes over budget.
+"""
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from .queries import QueryRecorder
+
+
+class QueryBudgetMixin:
+    """Mixin for ``django.test.TestCase`` adding query budget assertions"""
+
+    def assertQueryBudget(self, url_name, max_queries, args=None, kwargs=None,
+                          data=None, client=None, status_code=200):
+        """Request ``url_name`` and fail if it runs more than ``max_queries`` queries"""
+        client = client or self.client
+        url = reverse(url_name, args=args, kwargs=kwargs)
+
+        # The page cache would hide the queries being budgeted, and the test
+        # mirror of the replica cannot see rows the test case has not committed
+        with override_settings(PAGE_CACHE_URL_NAMES=[], READ_REPLICA_URL_NAMES=[]), \
+                QueryRecorder() as recorder:
+            response = client.get(url, data or {})
+
+        self.assertEqual(response.status_code, status_code)
+        if recorder.count > max_queries:
+            self.fail(
+                f"{url_name} ran {recorder.count} queries, budget is {max_queries}\n"
+                f"{recorder.report()}"
+            )
+        return response
@@ -0,0 +1,46 @@
+"""
+Query budgets for the main pages
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.models import Department, Faculty
+from courses.models import Course
+
+from . import statistics
+from .models import GalleryImage
+from .testing import QueryBudgetMixin
+
+
+class PageQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Computer Science', code='CSE')
+        for i in range(3):
+            user = User.objects.create(username=f'faculty{i}', first_name='Faculty', last_name=str(i))
+            faculty = Faculty.objects.create(
+                user=user, employee_id=f'E{i}', department=department, designation='lecturer',
+                specialization='Algorithms', qualification='PhD', is_featured=True,
+            )
+            Course.objects.create(
+                name=f'Course {i}', code=f'CSE{i}01', description='Course description',
+                department=department, instructor=faculty, credits=3, semester='fall',
+                year=2026, level='undergraduate', max_students=30, is_featured=True,
+            )
+        GalleryImage.objects.create(title='Campus', image='gallery/campus.jpg', is_featured=True)
+        statistics.rebuild()
+
+    def setUp(self):
+        # Cached sections outlive the rolled back test data
+        cache.clear()
+
+    def test_warm_home_page_runs_no_queries(self):
+        # The cold request runs one query per cached value
+        self.assertQueryBudget('main:home', 6)
+        self.assertQueryBudget('main:home', 0)
+
+    def test_warm_about_page_only_loads_faculty(self):
+        self.assertQueryBudget('main:home', 6)
+        self.assertQueryBudget('main:about', 1)
@@ -12,4 +12,5 @@ urlpatterns = [
     path('contact/', views.ContactView.as_view(), name='contact'),
     path('gallery/', views.GalleryView.as_view(), name='gallery'),
     path('search/', views.SearchView.as_view(), name='search'),
+    path('search/suggest/', views.SearchSuggestView.as_view(), name='search_suggest'),
 ]
\ No newline at end of file
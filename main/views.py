@@ -2,16 +2,22 @@
 Main app views for university website
 """
 from django.shortcuts import render, redirect
-from django.views.generic import TemplateView
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.utils.formats import date_format
+from django.utils.text import Truncator
+from django.utils.timezone import localtime
+from django.views.generic import TemplateView, View
+from django.views.static import serve
 from django.contrib import messages
-from django.db.models import Q
 from django.core.paginator import Paginator
 
-from .models import ContactMessage, GalleryImage, GalleryVideo, UniversityInfo
+from .models import ContactMessage, GalleryImage, GalleryVideo, SearchTerm
 from .forms import ContactForm
+from . import home, reference, search, statistics, suggest
+from .pagination import cursor_pagination_enabled, paginate_by_cursor
+from .storage import content_digest
 from accounts.models import Faculty
-from courses.models import Course
-from events.models import Event
 
 class HomeView(TemplateView):
     """Home page view with university overview"""
@@ -20,17 +26,11 @@ class HomeView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get university info
-        try:
-            context['university_info'] = UniversityInfo.objects.first()
-        except UniversityInfo.DoesNotExist:
-            context['university_info'] = None
-        
-        # Get featured content
-        context['featured_faculty'] = Faculty.objects.filter(is_featured=True)[:3]
-        context['recent_events'] = Event.objects.filter(is_published=True)[:3]
-        context['featured_courses'] = Course.objects.filter(is_featured=True)[:6]
-        context['featured_images'] = GalleryImage.objects.filter(is_featured=True)[:6]
+        # University info, counters and featured content, served from memory
+        # and the cache
+        context['university_info'] = reference.university_info.get()
+        context['statistics'] = statistics.university()
+        context.update(home.get_sections())
         
         return context
 
@@ -41,12 +41,10 @@ class AboutView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        try:
-            context['university_info'] = UniversityInfo.objects.first()
-        except UniversityInfo.DoesNotExist:
-            context['university_info'] = None
+        context['university_info'] = reference.university_info.get()
+        context['statistics'] = statistics.university()
             
-        context['faculty_members'] = Faculty.objects.all()[:8]
+        context['faculty_members'] = Faculty.objects.select_related('user', 'department')[:8]
         
         return context
 
@@ -58,10 +56,7 @@ class ContactView(TemplateView):
         context = super().get_context_data(**kwargs)
         context['form'] = ContactForm()
         
-        try:
-            context['university_info'] = UniversityInfo.objects.first()
-        except UniversityInfo.DoesNotExist:
-            context['university_info'] = None
+        context['university_info'] = reference.university_info.get()
             
         return context
     
@@ -86,6 +81,16 @@ class GalleryView(TemplateView):
         images = GalleryImage.objects.all()
         videos = GalleryVideo.objects.all()
         
+        if cursor_pagination_enabled():
+            context['images'] = paginate_by_cursor(
+                self.request, images, 12, ('-uploaded_at', 'pk'), param='image_cursor'
+            )
+            context['videos'] = paginate_by_cursor(
+                self.request, videos, 8, ('-uploaded_at', 'pk'), param='video_cursor'
+            )
+            context['cursor_pagination'] = True
+            return context
+        
         # Paginate images
         image_paginator = Paginator(images, 12)
         image_page = self.request.GET.get('image_page', 1)
@@ -101,40 +106,114 @@ class GalleryView(TemplateView):
 class SearchView(TemplateView):
     """Search functionality across the website"""
     template_name = 'main/search.html'
+    sections = [
+        ('courses', 'Courses', SearchTerm.KIND_COURSE),
+        ('faculty', 'Faculty', SearchTerm.KIND_FACULTY),
+        ('events', 'Events', SearchTerm.KIND_EVENT),
+        ('announcements', 'Announcements', SearchTerm.KIND_ANNOUNCEMENT),
+    ]
+    
+    def get(self, request, *args, **kwargs):
+        # "Show more" requests fetch one further page of a single section
+        if request.GET.get('section'):
+            return self.get_section_page(request.GET['section'])
+        return super().get(request, *args, **kwargs)
+    
+    def get_section_page(self, section):
+        kinds = {name: kind for name, _label, kind in self.sections}
+        if section not in kinds:
+            raise Http404("Unknown search section")
+        
+        per_page = settings.SEARCH_RESULTS_PER_PAGE
+        _normalized, results = search.cached_search(self.request.GET.get('q', ''), per_page)
+        ids, _first_page = results[kinds[section]]
+        
+        # Paginating the cached id list needs no COUNT query
+        page = Paginator(ids, per_page).get_page(self.request.GET.get('page'))
+        objects = search.fetch_ranked(kinds[section], list(page.object_list))
+        
+        return JsonResponse({
+            'section': section,
+            'page': page.number,
+            'next_page': page.next_page_number() if page.has_next() else None,
+            'results': [search_result(kinds[section], obj) for obj in objects],
+        })
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         query = self.request.GET.get('q', '')
         
         if query:
-            # Search in courses
-            courses = Course.objects.filter(
-                Q(name__icontains=query) | 
-                Q(description__icontains=query) |
-                Q(department__name__icontains=query)
-            )
+            per_page = settings.SEARCH_RESULTS_PER_PAGE
+            _normalized, results = search.cached_search(query, per_page)
             
-            # Search in faculty
-            faculty = Faculty.objects.filter(
-                Q(user__first_name__icontains=query) |
-                Q(user__last_name__icontains=query) |
-                Q(department__name__icontains=query) |
-                Q(specialization__icontains=query)
-            )
-            
-            # Search in events
-            events = Event.objects.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query),
-                is_published=True
-            )
+            sections = []
+            for name, label, kind in self.sections:
+                ids, first_page = results[kind]
+                sections.append({
+                    'name': name,
+                    'label': label,
+                    'count': len(ids),
+                    'results': [search_result(kind, obj) for obj in first_page],
+                    'next_page': 2 if len(ids) > per_page else None,
+                })
             
             context.update({
                 'query': query,
-                'courses': courses,
-                'faculty': faculty,
-                'events': events,
-                'total_results': courses.count() + faculty.count() + events.count()
+                'sections': sections,
+                'total_results': sum(section['count'] for section in sections)
             })
         
-        return context
\ No newline at end of file
+        return context
+
+
+def search_result(kind, obj):
+    """Flatten a search hit into the fields shown on the results page"""
+    if kind == SearchTerm.KIND_COURSE:
+        return {
+            'title': f"{obj.code} - {obj.name}",
+            'subtitle': f"{obj.department.name} · {obj.instructor.user.get_full_name()}",
+            'snippet': Truncator(obj.description).words(30),
+            'url': obj.get_absolute_url(),
+        }
+    if kind == SearchTerm.KIND_FACULTY:
+        return {
+            'title': obj.user.get_full_name(),
+            'subtitle': f"{obj.get_designation_display()} · {obj.department.name}",
+            'snippet': obj.specialization,
+            'url': obj.get_absolute_url(),
+        }
+    if kind == SearchTerm.KIND_EVENT:
+        return {
+            'title': obj.title,
+            'subtitle': f"{obj.get_event_type_display()} · {date_format(localtime(obj.start_date), 'M d, Y')}",
+            'snippet': Truncator(obj.description).words(30),
+            'url': obj.get_absolute_url(),
+        }
+    return {
+        'title': obj.title,
+        'subtitle': f"{obj.get_priority_display()} priority · {date_format(localtime(obj.created_at), 'M d, Y')}",
+        'snippet': Truncator(obj.content).words(30),
+        'url': obj.get_absolute_url(),
+    }
+
+class SearchSuggestView(View):
+    """JSON typeahead suggestions answered from the in-memory prefix index"""
+    min_length = 2
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', '').strip()
+        suggestions = suggest.index.lookup(query) if len(query) >= self.min_length else []
+        return JsonResponse({'query': query, 'suggestions': suggestions})
+
+class MediaView(View):
+    """Serve uploaded media; content-addressed files are cached as immutable"""
+
+    def get(self, request, path):
+        response = serve(request, path, document_root=settings.MEDIA_ROOT)
+        if content_digest(path):
+            # The bytes behind a content-addressed URL never change
+            response['Cache-Control'] = f'public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            response['Cache-Control'] = f'public, max-age={settings.MEDIA_MAX_AGE}'
+        return response
@@ -15,6 +15,9 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Initialize form enhancements
     initializeFormEnhancements();
+    
+    // Initialize "show more" buttons on the search results page
+    initializeSearchResults();
 });
 
 // Theme Management
@@ -94,14 +97,11 @@ function initializeSearch() {
     const searchInput = searchForm?.querySelector('input[name="q"]');
     
     if (searchInput) {
-        // Add search suggestions (you can expand this with AJAX)
-        searchInput.addEventListener('input', function() {
-            const query = this.value.trim();
-            if (query.length > 2) {
-                // Here you could implement live search suggestions
-                console.log('Searching for:', query);
-            }
-        });
+        // Live search suggestions
+        const suggestUrl = searchForm.dataset.suggestUrl;
+        if (suggestUrl) {
+            initializeSearchSuggestions(searchForm, searchInput, suggestUrl);
+        }
         
         // Add keyboard shortcuts
         document.addEventListener('keydown', function(e) {
@@ -114,6 +114,150 @@ function initializeSearch() {
     }
 }
 
+function initializeSearchSuggestions(searchForm, searchInput, suggestUrl) {
+    const list = document.createElement('div');
+    list.className = 'list-group search-suggestions shadow d-none';
+    searchForm.querySelector('.input-group').appendChild(list);
+    
+    let controller = null;
+    
+    function hideSuggestions() {
+        list.classList.add('d-none');
+        list.innerHTML = '';
+    }
+    
+    function renderSuggestions(suggestions) {
+        list.innerHTML = '';
+        if (!suggestions.length) {
+            hideSuggestions();
+            return;
+        }
+        suggestions.forEach(item => {
+            const link = document.createElement('a');
+            link.className = 'list-group-item list-group-item-action d-flex justify-content-between align-items-center';
+            link.href = item.url;
+            link.textContent = item.label;
+            
+            const badge = document.createElement('span');
+            badge.className = 'badge bg-secondary text-capitalize ms-2';
+            badge.textContent = item.kind;
+            link.appendChild(badge);
+            
+            list.appendChild(link);
+        });
+        list.classList.remove('d-none');
+    }
+    
+    const fetchSuggestions = debounce(function(query) {
+        // Cancel the previous request so stale answers never win
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+        
+        fetch(`${suggestUrl}?q=${encodeURIComponent(query)}`, {
+            headers: { 'Accept': 'application/json' },
+            signal: controller.signal,
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.query === searchInput.value.trim()) {
+                renderSuggestions(data.suggestions);
+            }
+        })
+        .catch(error => {
+            if (error.name !== 'AbortError') {
+                console.error('Error:', error);
+            }
+        });
+    }, 200);
+    
+    searchInput.addEventListener('input', function() {
+        const query = this.value.trim();
+        if (query.length >= 2) {
+            fetchSuggestions(query);
+        } else {
+            if (controller) {
+                controller.abort();
+            }
+            hideSuggestions();
+        }
+    });
+    
+    searchInput.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape') {
+            hideSuggestions();
+        }
+    });
+    
+    document.addEventListener('click', function(e) {
+        if (!searchForm.contains(e.target)) {
+            hideSuggestions();
+        }
+    });
+}
+
+// Search results: fetch further pages of one section in place
+function initializeSearchResults() {
+    document.querySelectorAll('[data-search-more]').forEach(button => {
+        button.addEventListener('click', function() {
+            const section = this.dataset.section;
+            const container = document.getElementById(`search-${section}`);
+            const params = new URLSearchParams({
+                q: this.dataset.query,
+                section: section,
+                page: this.dataset.page,
+            });
+            
+            button.disabled = true;
+            fetch(`${this.dataset.url}?${params}`, {
+                headers: { 'Accept': 'application/json' },
+            })
+            .then(response => response.json())
+            .then(data => {
+                data.results.forEach(result => {
+                    container.appendChild(renderSearchResult(result));
+                });
+                if (data.next_page) {
+                    button.dataset.page = data.next_page;
+                    button.disabled = false;
+                } else {
+                    button.remove();
+                }
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                button.disabled = false;
+                showNotification('Could not load more results. Please try again.', 'danger');
+            });
+        });
+    });
+}
+
+function renderSearchResult(result) {
+    const item = document.createElement('div');
+    item.className = 'search-result-item';
+    
+    const link = document.createElement('a');
+    link.className = 'search-result-title';
+    link.href = result.url;
+    link.textContent = result.title;
+    item.appendChild(link);
+    
+    const subtitle = document.createElement('div');
+    subtitle.className = 'small text-muted';
+    subtitle.textContent = result.subtitle;
+    item.appendChild(subtitle);
+    
+    if (result.snippet) {
+        const snippet = document.createElement('p');
+        snippet.className = 'mb-0';
+        snippet.textContent = result.snippet;
+        item.appendChild(snippet);
+    }
+    return item;
+}
+
 // Bootstrap Components Initialization
 function initializeBootstrapComponents() {
     // Initialize tooltips
@@ -267,29 +411,88 @@ function openLightbox(src, alt) {
 }
 
 // Course enrollment functionality
+// Pages mark the pieces to update with data attributes:
+//   data-enroll-button="<course id>"  the enroll/unenroll button
+//   data-seats-left="<course id>"     the remaining-seats figure
 function handleEnrollment(courseId, action) {
     const url = action === 'enroll' ? `/courses/${courseId}/enroll/` : `/courses/${courseId}/unenroll/`;
+    const button = document.querySelector(`[data-enroll-button="${courseId}"]`);
+    if (button) {
+        button.disabled = true;
+    }
     
     fetch(url, {
         method: 'POST',
         headers: {
             'X-CSRFToken': getCookie('csrftoken'),
-            'Content-Type': 'application/json',
+            'Accept': 'application/json',
         },
     })
-    .then(response => {
-        if (response.ok) {
-            location.reload();
+    .then(response => response.json().then(data => ({ response, data })))
+    .then(({ response, data }) => {
+        updateEnrollmentState(courseId, data);
+        if (response.status === 202 && data.status_url) {
+            showNotification(data.message, 'info');
+            pollEnrollmentRequest(courseId, data.status_url);
         } else {
-            showNotification('An error occurred. Please try again.', 'danger');
+            showNotification(data.message, response.ok ? 'success' : 'danger');
         }
     })
     .catch(error => {
         console.error('Error:', error);
+        if (button) {
+            button.disabled = false;
+        }
         showNotification('An error occurred. Please try again.', 'danger');
     });
 }
 
+function updateEnrollmentState(courseId, data) {
+    const seats = document.querySelector(`[data-seats-left="${courseId}"]`);
+    if (seats && data.seats_left !== undefined) {
+        seats.textContent = data.seats_left;
+    }
+    
+    const button = document.querySelector(`[data-enroll-button="${courseId}"]`);
+    if (!button) {
+        return;
+    }
+    button.disabled = data.status === 'pending';
+    if (data.enrolled === undefined) {
+        return;
+    }
+    const nextAction = data.enrolled ? 'unenroll' : 'enroll';
+    button.dataset.action = nextAction;
+    button.textContent = data.enrolled ? 'Unenroll' : 'Enroll Now';
+    button.classList.toggle('btn-outline-danger', data.enrolled);
+    button.classList.toggle('btn-primary', !data.enrolled);
+    button.onclick = () => handleEnrollment(courseId, nextAction);
+}
+
+// Queued enrollments are applied by a background worker; poll until decided
+function pollEnrollmentRequest(courseId, statusUrl, attempt = 0) {
+    updateEnrollmentState(courseId, { status: 'pending' });
+    setTimeout(() => {
+        fetch(statusUrl, { headers: { 'Accept': 'application/json' } })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'pending') {
+                if (attempt < 30) {
+                    pollEnrollmentRequest(courseId, statusUrl, attempt + 1);
+                }
+                return;
+            }
+            updateEnrollmentState(courseId, {
+                status: data.status,
+                enrolled: data.status === 'accepted',
+                seats_left: data.seats_left,
+            });
+            showNotification(data.message, data.status === 'accepted' ? 'success' : 'danger');
+        })
+        .catch(error => console.error('Error:', error));
+    }, Math.min(1000 * (attempt + 1), 5000));
+}
+
 // Get CSRF token from cookies
 function getCookie(name) {
     let cookieValue = null;
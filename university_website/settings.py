@@ -36,12 +36,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'main.middleware.QueryInspectorMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'main.middleware.ReadReplicaMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'main.middleware.AnonymousPageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'university_website.urls'
@@ -69,6 +72,39 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    # Read-only connection to the same file, used by the read-heavy views
+    # (READ_REPLICA_URL_NAMES); point it at a real replica on other backends
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"file:{BASE_DIR / 'db.sqlite3'}?mode=ro",
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['main.routers.ReadReplicaRouter']
+
+# Applied to every new SQLite connection (see main.db). WAL lets readers
+# proceed while enrollment writes commit; busy_timeout makes writers wait
+# for the lock instead of failing with "database is locked"
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # milliseconds
+    'cache_size': -20000,  # negative means KiB, i.e. 20 MB
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Cache
+# Local memory is per process; point this at Memcached or Redis when running
+# several workers so invalidation stamps are shared between them
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'university-website',
     }
 }
 
@@ -105,6 +141,20 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored once, under their content hash (main.storage); run
+# the dedupe_media command to move files uploaded before this
+STORAGES = {
+    'default': {'BACKEND': 'main.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Media served by Django (development); in production the web server should
+# send the same immutable Cache-Control header for MEDIA_URL + 'content/'
+# files named exactly <hash>.<ext> (see main.storage.CONTENT_NAME_RE)
+SERVE_MEDIA = DEBUG
+MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60  # seconds
+MEDIA_MAX_AGE = 60 * 60  # seconds, for renditions and files not named by content hash
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -115,4 +165,79 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 # Login/Logout URLs
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'main:home'
-LOGOUT_REDIRECT_URL = 'main:home'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'main:home'
+
+# Home page sections are invalidated by model signals; the timeout is only
+# a safety net
+HOME_CACHE_TIMEOUT = 6 * 60 * 60  # seconds
+
+# Full-page cache for anonymous visitors. Entries are invalidated by model
+# signals; the timeout bounds staleness for data changed without signals
+# (such as seat counters)
+PAGE_CACHE_TIMEOUT = 5 * 60  # seconds
+PAGE_CACHE_URL_NAMES = [
+    'main:home',
+    'main:about',
+    'main:gallery',
+    'accounts:faculty_list',
+    'accounts:faculty_detail',
+    'courses:course_list',
+    'courses:course_detail',
+    'courses:department_list',
+    'courses:department_detail',
+    'events:event_list',
+    'events:event_detail',
+    'events:event_calendar',
+    'events:event_calendar_year',
+    'events:event_calendar_month',
+    'events:event_calendar_week',
+    'events:event_calendar_range',
+    'events:announcement_list',
+    'events:announcement_detail',
+]
+
+# Views whose reads are served by the read-only 'replica' database alias
+READ_REPLICA_URL_NAMES = PAGE_CACHE_URL_NAMES + [
+    'main:search',
+    'main:search_suggest',
+]
+
+# Query inspector (development/staging): counts SQL queries per request and
+# logs query shapes repeated at least the threshold number of times
+QUERY_INSPECTOR_ENABLED = DEBUG
+QUERY_INSPECTOR_N_PLUS_ONE_THRESHOLD = 5
+
+# Event calendar months are invalidated when an event in them changes; the
+# timeout is only a safety net
+CALENDAR_CACHE_TIMEOUT = 24 * 60 * 60  # seconds
+
+# Search
+SEARCH_RESULTS_PER_PAGE = 10
+SEARCH_CACHE_TIMEOUT = 300  # seconds
+
+# Enrollment
+# When enabled, enroll requests are queued and applied by the
+# process_enrollment_queue management command
+ENROLLMENT_QUEUE_ENABLED = False
+
+# Announcements
+# The archive_announcements command moves announcements this many days past
+# their expiry into the ArchivedAnnouncement table
+ANNOUNCEMENT_ARCHIVE_AFTER_DAYS = 180
+
+# Image renditions
+# Uploaded gallery, event and profile pictures are also stored at these
+# widths (plus WebP copies); the generate_renditions command backfills them
+IMAGE_RENDITION_WIDTHS = [160, 320, 640, 1280]
+IMAGE_RENDITION_QUALITY = 82
+
+# Gallery ZIP import (import_gallery command): stored originals are capped
+# at this width, and members larger than this many bytes are skipped
+GALLERY_IMPORT_MAX_WIDTH = 2560
+GALLERY_IMPORT_MAX_FILE_SIZE = 50 * 1024 * 1024
+
+# Pagination
+# When enabled, the course, faculty, event, announcement and gallery lists
+# page by keyset cursors (no COUNT query, constant cost on deep pages);
+# templates render the controls with includes/cursor_pagination.html
+CURSOR_PAGINATION = False
@@ -1,10 +1,13 @@
 """
 URL configuration for university_website project.
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from main.views import MediaView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -15,5 +18,7 @@ urlpatterns = [
 ]
 
 # Serve media files during development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+if settings.SERVE_MEDIA:
+    urlpatterns += [
+        re_path(rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.*)$", MediaView.as_view(), name='media'),
+    ]
\ No newline at end of file